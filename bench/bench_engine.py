@@ -0,0 +1,214 @@
+# global imports
+import argparse
+from itertools import cycle, islice
+import json
+import platform
+import subprocess
+from time import perf_counter
+import tracemalloc
+
+# local imports
+from constants import *
+from game import Game
+from models import RobotToUserModel
+from utils import *
+
+# run from the repository root:
+#   python -m bench.bench_engine --output before.json
+#   python -m bench.bench_engine --compare before.json after.json
+BENCH_USER = 'BenchEngineName'
+BENCH_SEED = 0
+
+SYNTHETIC_ROBOTS = {
+    'IdleRobot':
+        'from robot import Robot\n'
+        '\n\n'
+        'class IdleRobot(Robot):\n'
+        '    def respond(self):\n'
+        '        pass\n',
+    'ScannerRobot':
+        'from robot import Robot\n'
+        '\n\n'
+        'class ScannerRobot(Robot):\n'
+        '    def initialize(self):\n'
+        '        self.i = 0\n'
+        '    def respond(self):\n'
+        '        self.point_scanner(self.i * 20, 10)\n'
+        '        self.i += 1\n',
+    'ShooterRobot':
+        'from robot import Robot\n'
+        '\n\n'
+        'class ShooterRobot(Robot):\n'
+        '    def initialize(self):\n'
+        '        self.i = 0\n'
+        '    def respond(self):\n'
+        '        self.point_scanner(self.i * 20, 10)\n'
+        '        if self.is_cannon_ready():\n'
+        '            self.cannon(self.i * 7, 100 + self.i % 400)\n'
+        '        self.i += 1\n',
+    'WallRobot':
+        'from robot import Robot\n'
+        '\n\n'
+        'class WallRobot(Robot):\n'
+        '    def respond(self):\n'
+        '        x, y = self.get_position()\n'
+        '        direction = self.get_direction()\n'
+        '        if direction == 0 and x > 950:\n'
+        '            direction = 90\n'
+        '        elif direction == 90 and y > 950:\n'
+        '            direction = 180\n'
+        '        elif direction == 180 and x < 50:\n'
+        '            direction = 270\n'
+        '        elif direction == 270 and y < 50:\n'
+        '            direction = 0\n'
+        '        self.drive(direction, 40)\n',
+}
+
+# robots sets, every game cycles over the names of its set
+ROBOT_SETS = {
+    'default': list(DEFAULT_ROBOTS),
+    'idle': ['IdleRobot'],
+    'scanner': ['ScannerRobot'],
+    'shooter': ['ShooterRobot'],
+    'wall': ['WallRobot'],
+}
+
+
+def setup_robots():
+    robots_dir = f'{ROBOTS_DIR}/{BENCH_USER}'
+    for robot_name, code in {**DEFAULT_ROBOTS, **SYNTHETIC_ROBOTS}.items():
+        save_robot(robots_dir, f'{camel_to_snake(robot_name)}.py', code)
+    return robots_dir
+
+
+def create_game(robot_set: str, count: int, rounds: int, is_sim: bool,
+                profile: bool = False):
+    names = islice(cycle(ROBOT_SETS[robot_set]), count)
+    robots = [RobotToUserModel(name=n, owner_name=BENCH_USER) for n in names]
+    return Game(rounds, 1, robots, is_sim, seed=BENCH_SEED,
+                profile=profile)
+
+
+def run_scenario(robot_set: str, count: int, rounds: int, is_sim: bool,
+                 memory: bool):
+    game = create_game(robot_set, count, rounds, is_sim, True)
+    start = perf_counter()
+    game.play_single()
+    seconds = perf_counter() - start
+
+    phases = game.profiles[-1]['phases']
+    rounds_played = phases.pop('round')['calls']
+    timings = {phase: t['seconds'] for phase, t in phases.items()}
+
+    # tracing slows the game down, memory is measured on a second run
+    peak_memory = None
+    if memory:
+        game = create_game(robot_set, count, rounds, is_sim)
+        tracemalloc.start()
+        game.play_single()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'robots': robot_set,
+        'count': count,
+        'rounds': rounds,
+        'is_sim': is_sim,
+        'rounds_played': rounds_played,
+        'seconds': seconds,
+        'rounds_per_second': rounds_played / seconds,
+        'phases': timings,
+        'peak_memory': peak_memory,
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_scenario_key(result: dict):
+    return (result['robots'], result['count'], result['rounds'],
+            result['is_sim'])
+
+
+def report(result: dict):
+    phases = '  '.join(f'{phase} {seconds:.3f}s'
+                       for phase, seconds in result['phases'].items())
+    memory = result['peak_memory']
+    memory = '-' if memory is None else f'{memory / 1024:.0f}KiB'
+    print(f"{result['robots']:<8} {result['count']} robots "
+          f"{result['rounds']:>6} rounds "
+          f"{result['rounds_per_second']:>9.0f} rounds/s  "
+          f"peak {memory}  {phases}")
+
+
+def compare(before_path: str, after_path: str):
+    with open(before_path) as fd:
+        before = json.load(fd)
+    with open(after_path) as fd:
+        after = json.load(fd)
+
+    before_results = {get_scenario_key(r): r for r in before['results']}
+    for result in after['results']:
+        old = before_results.get(get_scenario_key(result))
+        if old is None:
+            continue
+        speedup = result['rounds_per_second'] / old['rounds_per_second']
+        print(f"{result['robots']:<8} {result['count']} robots "
+              f"{result['rounds']:>6} rounds "
+              f"{old['rounds_per_second']:>9.0f} -> "
+              f"{result['rounds_per_second']:>9.0f} rounds/s  "
+              f"{speedup:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--robots', nargs='+', default=list(ROBOT_SETS),
+                        choices=list(ROBOT_SETS))
+    parser.add_argument('--counts', nargs='+', type=int, default=[2, 4])
+    parser.add_argument('--rounds', nargs='+', type=int,
+                        default=[100, 1000])
+    parser.add_argument('--sim', action='store_true',
+                        help='log rounds like a simulation')
+    parser.add_argument('--no-memory', action='store_true')
+    parser.add_argument('--output', help='write results as json')
+    parser.add_argument('--compare', nargs=2,
+                        metavar=('BEFORE', 'AFTER'),
+                        help='compare two json outputs')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    robots_dir = setup_robots()
+    results = []
+    try:
+        for robot_set in args.robots:
+            for count in args.counts:
+                for rounds in args.rounds:
+                    result = run_scenario(robot_set, count, rounds,
+                                          args.sim, not args.no_memory)
+                    report(result)
+                    results.append(result)
+    finally:
+        remove_dir(robots_dir)
+
+    if args.output:
+        output = {
+            'commit': get_commit(),
+            'engine_version': ENGINE_VERSION,
+            'python': platform.python_version(),
+            'results': results,
+        }
+        with open(args.output, 'w') as fd:
+            json.dump(output, fd, indent=2)
+
+
+if __name__ == '__main__':
+    main()
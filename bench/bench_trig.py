@@ -0,0 +1,77 @@
+# global imports
+from math import cos, radians, sin
+from random import Random
+from timeit import timeit
+
+# local imports
+from constants import *
+from missile import Missile
+from utils import clamp, cos_d, sin_d
+
+# run from the repository root: python -m bench.bench_trig
+NUMBER = 20
+
+
+def math_cos_d(degrees: int):
+    return cos(radians(degrees))
+
+
+def math_sin_d(degrees: int):
+    return sin(radians(degrees))
+
+
+class MathMissile(Missile):
+    def move(self):
+        direction = self.direction
+        change_x, change_y = math_cos_d(direction), math_sin_d(direction)
+
+        x, y = self.position
+        x = clamp(0, round(x + (DISTANCE_MISSILE_ROUND * change_x)), 999)
+        y = clamp(0, round(y + (DISTANCE_MISSILE_ROUND * change_y)), 999)
+
+        self.distance -= DISTANCE_MISSILE_ROUND
+        if self.distance <= 0:
+            self.position = self.final_position
+        else:
+            self.position = x, y
+
+
+def run_trig(cos_f, sin_f, degrees: list):
+    for d in degrees:
+        cos_f(d)
+        sin_f(d)
+
+
+def run_missiles(missiles: list):
+    for m in missiles:
+        m.position = (500, 500)
+        m.distance = 1000
+        m.move()
+
+
+def report(name: str, math_time: float, table_time: float):
+    print(f'{name:<16} math {math_time:.4f}s  table {table_time:.4f}s  '
+          f'speedup {math_time / table_time:.2f}x')
+
+
+def main():
+    rand = Random(0)
+    degrees = [rand.randrange(0, 360) for _ in range(100000)]
+    math_missiles = [MathMissile(d, 1000, (500, 500), (999, 999))
+                     for d in degrees]
+    missiles = [Missile(d, 1000, (500, 500), (999, 999))
+                for d in degrees]
+
+    math_time = timeit(lambda: run_trig(math_cos_d, math_sin_d, degrees),
+                       number=NUMBER)
+    table_time = timeit(lambda: run_trig(cos_d, sin_d, degrees),
+                        number=NUMBER)
+    report('cos_d/sin_d', math_time, table_time)
+
+    math_time = timeit(lambda: run_missiles(math_missiles), number=NUMBER)
+    table_time = timeit(lambda: run_missiles(missiles), number=NUMBER)
+    report('Missile.move', math_time, table_time)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+from os import cpu_count
 from string import digits, ascii_letters
 
 # static files
@@ -39,6 +40,7 @@ AVATAR_STRING_ENCODE = 'utf-8'
 
 # game
 GAME_ROUNDS = 100
+GAME_SEED_MAX = 2**32
 SCANNER_DISTANCE = 1500
 DISTANCE_MISSILE_ROUND = 10
 COOLDOWN_MISSILE = 3
@@ -46,8 +48,91 @@ DAMAGE_COLLISION = 2
 DAMAGE_MISSIL_MIN = 3
 DAMAGE_MISSIL_MED = 5
 DAMAGE_MISSIL_MAX = 10
+MISSILE_DAMAGE_AREAS = [(5, DAMAGE_MISSIL_MAX),
+                        (20, DAMAGE_MISSIL_MED),
+                        (40, DAMAGE_MISSIL_MIN)]
 MAX_ACCEL_TO_TURN = 50
 
+# robot time limits, calls are limited by the cpu time they use so a busy
+# host does not kill robots, blocked robots are stopped by wall time
+ROBOT_TIMEOUT = 0.05
+ROBOT_WALL_TIMEOUT = 0.25
+ROBOT_CPU_BUDGET = 20
+# blocked calls use no cpu, their wall time has its own budget per game
+ROBOT_WALL_BUDGET = 30
+ROBOT_CPU_WAIT_MIN = 0.005
+TIMEOUT_CALL = 'call'
+TIMEOUT_WALL = 'wall'
+TIMEOUT_BUDGET = 'budget'
+
+# robots in child processes, limits are for the whole game
+ROBOT_SANDBOX = True
+ROBOT_SANDBOX_CPU = 30
+ROBOT_SANDBOX_MEMORY = 512 * 1024 * 1024
+ROBOT_SANDBOX_START_TIMEOUT = 5
+ROBOT_SANDBOX_STOP_TIMEOUT = 1
+# how state goes to the child, shared memory skips the pipe syscalls
+TRANSPORT_PIPE = 'pipe'
+TRANSPORT_SHM = 'shm'
+SANDBOX_TRANSPORTS = [TRANSPORT_PIPE, TRANSPORT_SHM]
+ROBOT_SANDBOX_TRANSPORT = TRANSPORT_PIPE
+ROBOT_SANDBOX_RING_SLOTS = 4
+# how often a waiting child checks that the engine is still there
+ROBOT_SANDBOX_POLL = 1
+
+# bump when a change makes games with the same seed play differently
+ENGINE_VERSION = 2
+
+# stalemates, nothing moved, exploded or took damage for STALEMATE_ROUNDS
+STALEMATE_OFF = 'off'
+STALEMATE_DRAW = 'draw'
+STALEMATE_DAMAGE = 'damage'
+STALEMATE_POLICIES = [STALEMATE_OFF, STALEMATE_DRAW, STALEMATE_DAMAGE]
+STALEMATE_ROUNDS = 100
+MATCH_STALEMATE = STALEMATE_DRAW
+
+# simulation logs
+LOG_FULL = 'full'
+LOG_DELTA = 'delta'
+LOG_MODES = [LOG_FULL, LOG_DELTA]
+LOG_KEYFRAME_INTERVAL = 100
+
+# simulation result formats
+SIMULATION_FORMAT_JSON = 'json'
+SIMULATION_FORMAT_REPLAY = 'replay'
+SIMULATION_FORMATS = [SIMULATION_FORMAT_JSON, SIMULATION_FORMAT_REPLAY]
+REPLAY_MEDIA_TYPE = 'application/vnd.pyrobots.replay'
+
+# simulation results cache
+SIMULATION_CACHE_BYTES = 64 * 1024 * 1024
+
+# simulation streams
+SIMULATION_STREAM_MEDIA_TYPE = 'application/x-ndjson'
+SIMULATION_STREAM_BUFFER = 64
+SIMULATION_STREAM_POLL = 0.1
+# seconds a whole stream can take, slow clients do not keep a game forever
+SIMULATION_STREAM_TIMEOUT = 60
+# streams wait for their clients, they have their own workers and limits
+SIMULATION_STREAM_WORKERS = 4
+SIMULATION_STREAM_QUEUE_SIZE = 16
+SIMULATION_STREAM_USER_LIMIT = 2
+
+# match workers
+MATCH_WORKERS = cpu_count() or 1
+
+# job scheduler, jobs past the queue size or the user limit are rejected
+JOB_WORKERS = 4
+JOB_QUEUE_SIZE = 64
+# below the workers, one user can never hold every worker
+JOB_USER_LIMIT = 2
+# done jobs keep their results for a while, then they are forgotten
+JOB_KEEP_SECONDS = 600
+JOB_KEEP_COUNT = 256
+JOB_MATCH = 'match'
+JOB_SIMULATION = 'simulation'
+# lower runs first
+JOB_PRIORITIES = {JOB_MATCH: 0, JOB_SIMULATION: 1}
+
 # robot movement
 VAR_ACCEL = 2
 MAX_ACCEL = 100
@@ -1,60 +1,120 @@
 # global imports
-from random import randrange
-from shapely.geometry import Point, Polygon
-from typing import List
-import importlib
-from func_timeout import func_timeout
+from concurrent.futures import Executor
+from random import Random, randrange
+from threading import Event
+from typing import Callable, Iterator, List
 
 # local imports
 from constants import *
 from models import *
 from missile import Missile
-from robot import Robot
+from profiler import *
+from robot import Robot, RobotState
+from robot_loader import load_robot_class
+from robot_sandbox import SandboxWorker
+from robot_worker import RobotWorker
+from round_log import delta_round_state
 from utils import *
 
 
+class GameCancelled(Exception):
+    pass
+
+
 class Game:
     games: int
     rounds: int
     robots: List[Robot] = []
+    names: List[str] = []
+    states: List[RobotState] = []
     players: List[str] = []
     damage_at_start: List[int] = []
     missiles: List[Missile] = []
+    spare_missiles: List[Missile] = []
     is_sim: bool
+    log_mode: str
+    robot_models: List[RobotToUserModel] = []
+    workers: List[RobotWorker] = []
+    seed: int
+    random: Random
+    stalemate: str
+    is_stalemate: bool
+    profiler: GameProfiler = None
+    profiles: List[dict] = []
+    # robots stopped by their time limits, one list per game
+    timeouts: List[List[dict]] = []
+    sandbox: bool
+    # set from another thread to stop the game between rounds
+    cancel: Event = None
 
     def __init__(
             self,
             rounds: int,
             games: int,
             robots: List[RobotToUserModel],
-            is_sim: bool):
+            is_sim: bool,
+            log_mode: str = LOG_FULL,
+            seed: int = None,
+            stalemate: str = STALEMATE_OFF,
+            profile: bool = False,
+            sandbox: bool = False,
+            cancel: Event = None):
+        if log_mode not in LOG_MODES:
+            raise ValueError(f'Invalid log mode: {log_mode}')
+        if stalemate not in STALEMATE_POLICIES:
+            raise ValueError(f'Invalid stalemate policy: {stalemate}')
+
         robots_in_game = []
         players_in_game = []
+        names = []
         damage = []
         for r in robots:
-            try:
-                module = importlib.import_module(
-                    f'{ROBOTS_DIR}.{r.owner_name}.{camel_to_snake(r.name)}'
-                )
-                _class = getattr(module, r.name)
-                instance = _class()
-                damage.append(0)
-            except BaseException:
+            if sandbox:
+                # robot code only runs in its sandbox, a robot that does
+                # not load fails its first call
                 instance = Robot()
-                damage.append(100)
+                names.append(r.name)
+                damage.append(0)
+            else:
+                try:
+                    _class = load_robot_class(r.owner_name, r.name)
+                    instance = _class()
+                    damage.append(0)
+                except BaseException:
+                    instance = Robot()
+                    damage.append(100)
+                names.append(get_robot_name_from_object(instance))
 
             robots_in_game.append(instance)
             players_in_game.append(r.owner_name)
 
         self.rounds = rounds
         self.games = games
+        self.robot_models = robots
         self.robots = robots_in_game
         self.players = players_in_game
+        self.names = names
         self.damage_at_start = damage
         self.is_sim = is_sim
+        self.log_mode = log_mode
+        # game i of this run is seeded with seed + i
+        self.seed = randrange(GAME_SEED_MAX) if seed is None else seed
+        self.random = Random(self.seed)
+        self.stalemate = stalemate
+        self.is_stalemate = False
+        self.states = []
         self.missiles = []
-
-    def scan(self, robot: Robot):
+        self.spare_missiles = []
+        self.workers = []
+        self.profiles = []
+        self.timeouts = []
+        self.sandbox = sandbox
+        self.cancel = cancel
+        if profile:
+            self.profiler = GameProfiler()
+            self.profiler.instrument(self, GAME_PHASES)
+
+    def scan(self, robot: RobotState):
         direction = robot.scanner_direction
         resolution = robot.scanner_resolution
         # point 1
@@ -65,9 +125,9 @@ class Game:
         # point 3
         x3 = round(x + (SCANNER_DISTANCE * cos_d(direction - resolution)))
         y3 = round(y + (SCANNER_DISTANCE * sin_d(direction - resolution)))
-        area = Polygon([(x, y), (x2, y2), (x3, y3)])
-        robots_in_scope = [r for r in self.robots
-                           if area.contains(Point(r.position))]
+        area = (x, y), (x2, y2), (x3, y3)
+        robots_in_scope = [r for r in self.states
+                           if triangle_contains(area, r.position)]
         scanner_result = -1
         if len(robots_in_scope) > 0:
             scanner_result = min([
@@ -77,7 +137,7 @@ class Game:
 
         robot.scanner_result = scanner_result
 
-    def compute_next_position(self, robot: Robot):
+    def compute_next_position(self, robot: RobotState):
         initial = robot.position
         if robot.is_alive():
             robot.update_accel()
@@ -100,21 +160,14 @@ class Game:
 
         return initial, final
 
-    def check_position(self, i: int, positions: list):
-        result = -1
-        for j in range(i):
-            if positions[i][1] == positions[j][1]:
-                result = j
-                break
-        return result
-
     def fix_position(self, i: int, j: int, positions: list):
         initial_i, final_i = positions[i]
-        robot_i = self.robots[i]
+        robot_i = self.states[i]
         initial_j, final_j = positions[j]
-        robot_j = self.robots[j]
+        robot_j = self.states[j]
 
         if initial_i == final_i:
+            moved = j
             change_x = cos_d(robot_j.direction)
             change_y = sin_d(robot_j.direction)
 
@@ -125,6 +178,7 @@ class Game:
             final_j = next_x, next_y
             positions[j] = initial_j, final_j
         else:
+            moved = i
             change_x = cos_d(robot_i.direction)
             change_y = sin_d(robot_i.direction)
 
@@ -137,18 +191,26 @@ class Game:
 
         robot_j.make_damage(DAMAGE_COLLISION)
         robot_i.make_damage(DAMAGE_COLLISION)
+        return moved
 
     def sanitize_positions(self, positions: list):
+        # final cell -> robot index, cells of robots before i never collide
+        cells = {}
         i = 0
         while i < len(positions):
-            j = self.check_position(i, positions)
-            if j != -1:
-                self.fix_position(i, j, positions)
-                i = 0
-            else:
+            final = positions[i][1]
+            j = cells.get(final)
+            if j is None:
+                cells[final] = i
                 i += 1
-
-    def fire(self, robot: Robot):
+            elif self.fix_position(i, j, positions) == j:
+                # robots after j must be checked again against its new cell
+                del cells[final]
+                for k in range(j + 1, i):
+                    del cells[positions[k][1]]
+                i = j
+
+    def fire(self, robot: RobotState):
         can_fire = robot.is_cannon_ready() and robot.cannon_fired
         if can_fire:
             direction = robot.cannon_direction
@@ -160,8 +222,12 @@ class Game:
             fx = clamp(0, round(x + (distance * change_x)), 999)
             fy = clamp(0, round(y + (distance * change_y)), 999)
 
-            # Create new missile
-            new_missile = Missile(direction, distance, (x, y), (fx, fy))
+            # Create new missile, reusing one that already exploded
+            if self.spare_missiles:
+                new_missile = self.spare_missiles.pop()
+                new_missile.launch(direction, distance, (x, y), (fx, fy))
+            else:
+                new_missile = Missile(direction, distance, (x, y), (fx, fy))
             self.missiles.append(new_missile)
 
             # Restart robot cannon state
@@ -173,48 +239,46 @@ class Game:
             if robot.rounds_to_cannon_ready == 0:
                 robot.cannon_ready = True
 
-    def missile_damage(self, robot: Robot):
-        for m in self.missiles:
-            distance = get_distance(m.final_position, robot.position)
-            misil_to_explode = (m.is_active and m.position == m.final_position)
-            damage_min = distance <= 40 and distance > 20
-            damage_med = distance <= 20 and distance > 5
-            damage_max = distance <= 5
-            if misil_to_explode:
-                if damage_min:
-                    robot.damage = clamp(
-                        0, robot.damage + DAMAGE_MISSIL_MIN, 100)
-                elif damage_med:
-                    robot.damage = clamp(
-                        0, robot.damage + DAMAGE_MISSIL_MED, 100)
-                elif damage_max:
-                    robot.damage = clamp(
-                        0, robot.damage + DAMAGE_MISSIL_MAX, 100)
-                m.is_active = False
+    def missile_damage(self):
+        exploding = [m for m in self.missiles
+                     if m.is_active and m.position == m.final_position]
+        if len(exploding) == 0:
+            return
+
+        # every robot alive takes damage from every explosion in range
+        for r in self.states:
+            if r.is_alive():
+                damage = sum(get_missile_damage(
+                    get_squared_distance(m.final_position, r.position))
+                    for m in exploding)
+                r.damage = clamp(0, r.damage + damage, 100)
+
+        for m in exploding:
+            m.is_active = False
 
     def set_initial_states(self):
+        self.states = []
         for i, r in enumerate(self.robots):
-            # status variables
-            r.accel = 0
-            r.damage = self.damage_at_start[i]
-            r.direction = 0
-            r.velocity = 0
-            r.position = (randrange(0, 1000), randrange(0, 1000))
-
-            # cannon variables
-            r.rounds_to_cannon_ready = COOLDOWN_MISSILE
-            r.cannon_direction = 0
-            r.cannon_distance = 0
-            r.cannon_ready = False
-            r.cannon_fired = False
-
-            # scanner variables
-            r.scanner_direction = 0
-            r.scanner_resolution = 0
-            r.scanner_result = -1
+            state = RobotState()
+            state.damage = self.damage_at_start[i]
+            state.position = (self.random.randrange(0, 1000),
+                              self.random.randrange(0, 1000))
+
+            # the robot object only sees the state through its properties
+            r.engine_state = state
+            self.states.append(state)
 
     def get_robots_alive(self):
-        return [r for r in self.robots if r.is_alive()]
+        return [r for r, s in zip(self.robots, self.states) if s.is_alive()]
+
+    def count_robots_alive(self):
+        return sum(1 for s in self.states if s.is_alive())
+
+    def get_stalemate_state(self):
+        # None while a missile is flying, it can still change the game
+        if self.missiles:
+            return None
+        return [(s.position, s.damage) for s in self.states]
 
     def log_round_state(self):
         robots = [{
@@ -224,7 +288,7 @@ class Game:
             'position': r.position,
             'scanner_direction': r.scanner_direction,
             'scanner_resolution': r.scanner_resolution}
-            for r in self.robots
+            for r in self.states
         ]
 
         missiles = [{
@@ -236,91 +300,256 @@ class Game:
 
         return {"robots": robots, "missiles": missiles}
 
+    def scan_robots(self):
+        for r in self.states:
+            if r.is_alive():
+                self.scan(r)
+
+    def fire_robots(self):
+        for r in self.states:
+            if r.is_alive():
+                self.fire(r)
+
+    def move_missiles(self):
+        for m in self.missiles:
+            m.move()
+
+    def move_robots(self):
+        next_positions = [self.compute_next_position(r) for r in self.states]
+        self.sanitize_positions(next_positions)
+
+        for i, r in enumerate(self.states):
+            r.move(next_positions[i][1])
+
+    def respond_robots(self):
+        for r, w in zip(self.states, self.workers):
+            if r.is_alive() and not w.call('respond'):
+                r.make_damage(100)
+
     def play_round(self):
         res = {}
 
         # call robot code
-        for r in self.robots:
-            if r.is_alive():
-                try:
-                    func_timeout(0.05, r.respond)
-                except BaseException:
-                    r.make_damage(100)
+        self.respond_robots()
 
         # scanner actions
-        for r in self.robots:
-            if r.is_alive():
-                self.scan(r)
+        self.scan_robots()
 
         # fire actions
-        for r in self.robots:
-            if r.is_alive():
-                self.fire(r)
+        self.fire_robots()
 
         # update missiles positions
-        for m in self.missiles:
-            m.move()
+        self.move_missiles()
 
         # deal damage if missile explode
-        for r in self.robots:
-            if r.is_alive():
-                self.missile_damage(r)
+        self.missile_damage()
 
         # update robots positions
-        next_positions = [self.compute_next_position(r) for r in self.robots]
-        self.sanitize_positions(next_positions)
-
-        for i, r in enumerate(self.robots):
-            r.move(next_positions[i][1])
+        self.move_robots()
 
         # log round if simulation
         if self.is_sim:
             res = self.log_round_state()
 
         # update active missiles
-        self.missiles = [m for m in self.missiles if m.is_active]
+        self.remove_inactive_missiles()
 
         return res
 
-    def play_game(self):
-        res = []
+    def remove_inactive_missiles(self):
+        # compact in place, exploded missiles are kept for reuse
+        active = 0
+        for m in self.missiles:
+            if m.is_active:
+                self.missiles[active] = m
+                active += 1
+            else:
+                self.spare_missiles.append(m)
+        del self.missiles[active:]
+
+    def iter_rounds(self, seed: int = None) -> Iterator[dict]:
+        self.random.seed(self.seed if seed is None else seed)
+        self.spare_missiles.extend(self.missiles)
         self.missiles = []
         self.set_initial_states()
+        self.is_stalemate = False
+        if self.profiler is not None:
+            self.profiler.reset()
+
+        # one long-lived worker per robot for the whole game, closing the
+        # generator early also stops them
+        is_profiled = self.profiler is not None
+        if self.sandbox:
+            self.workers = [SandboxWorker(m.owner_name, m.name, s, is_profiled)
+                            for m, s in zip(self.robot_models, self.states)]
+        else:
+            self.workers = [RobotWorker(r, is_profiled) for r in self.robots]
+        try:
+            for r, w in zip(self.states, self.workers):
+                if not w.call('initialize'):
+                    r.make_damage(100)
 
-        for r in self.robots:
-            try:
-                func_timeout(0.05, r.initialize)
-            except BaseException:
-                r.make_damage(100)
-
-        for _ in range(self.rounds):
-            round_log = self.play_round()
-
-            if self.is_sim:
-                res.append(round_log)
-
-            alive_robots = self.get_robots_alive()
-            if len(alive_robots) < 2:
-                break
-
-        return res
-
-    def play(self):
-        log = []
+            previous_log = None
+            previous_state = None
+            still_rounds = 0
+            for i in range(self.rounds):
+                self.check_cancelled()
+                round_log = self.play_round()
+
+                if self.is_sim and self.log_mode == LOG_DELTA:
+                    keyframe = i % LOG_KEYFRAME_INTERVAL == 0
+                    yield delta_round_state(previous_log, round_log, keyframe)
+                    previous_log = round_log
+                elif self.is_sim:
+                    yield round_log
+
+                if self.count_robots_alive() < 2:
+                    break
+
+                if self.stalemate != STALEMATE_OFF:
+                    state = self.get_stalemate_state()
+                    if state is not None and state == previous_state:
+                        still_rounds += 1
+                    else:
+                        still_rounds = 0
+                    previous_state = state
+                    if still_rounds >= STALEMATE_ROUNDS:
+                        self.is_stalemate = True
+                        break
+        finally:
+            for w in self.workers:
+                w.stop()
+            self.store_timeouts()
+            if is_profiled:
+                self.store_profile()
+
+    def check_cancelled(self):
+        if self.cancel is not None and self.cancel.is_set():
+            raise GameCancelled()
+
+    def store_timeouts(self):
+        timeouts = []
+        for n, p, w in zip(self.names, self.players, self.workers):
+            if w.cpu.exceeded is not None:
+                timeouts.append({'name': n,
+                                 'owner': p,
+                                 'reason': w.cpu.exceeded})
+        self.timeouts.append(timeouts)
+
+    def store_profile(self):
+        robots = []
+        for n, p, w in zip(self.names, self.players, self.workers):
+            calls = {method: get_timing_dict(timing)
+                     for method, timing in w.timings.items()}
+            robots.append({'name': n,
+                           'owner': p,
+                           'calls': calls,
+                           'cpu': w.cpu.to_dict()})
+        profile = self.profiler.to_dict(robots)
+        self.profiles.append(profile)
+        log_profile(profile)
+
+    def get_winner(self):
         winner = None
+        alive_robots = self.get_robots_alive()
+        if self.is_stalemate and self.stalemate == STALEMATE_DAMAGE:
+            # least damaged robot wins, unless it is a tie
+            damage = [r.damage for r in alive_robots]
+            if damage.count(min(damage)) == 1:
+                alive_robots = [alive_robots[damage.index(min(damage))]]
+
+        if len(alive_robots) == 1:
+            i = self.robots.index(alive_robots[0])
+            winner_name = self.names[i]
+            winner_owner = self.players[i]
+            winner = {'name': winner_name, 'owner': winner_owner}
+
+        return winner
+
+    def play_game(self, seed: int = None):
+        return list(self.iter_rounds(seed))
+
+    def play_single(self, seed: int = None):
+        game_log = self.play_game(seed)
+        return game_log, self.get_winner()
+
+    def get_game_seed(self, game: int):
+        return self.seed + game
+
+    def iter_games(self, executor: Executor = None):
+        # yields (game log, winner), a game without winner keeps the
+        # winner of the previous one
+        winner = None
+        # timeouts and profiles are only kept for the last run
+        self.timeouts = []
+        self.profiles = []
 
-        for _ in range(self.games):
-            game_log = self.play_game()
-
+        if executor is None:
+            results = (self.play_single(self.get_game_seed(i))
+                       for i in range(self.games))
+        else:
+            args = (self.rounds, self.robot_models, self.is_sim,
+                    self.log_mode)
+            futures = [executor.submit(play_single_task, *args,
+                                       self.get_game_seed(i), self.stalemate,
+                                       self.profiler is not None,
+                                       self.sandbox)
+                       for i in range(self.games)]
+            results = (self.add_task_results(*f.result()) for f in futures)
+
+        try:
+            for game_log, game_winner in results:
+                # games in the executor only stop between games
+                self.check_cancelled()
+                if game_winner is not None:
+                    winner = game_winner
+                yield game_log, winner
+        finally:
+            if executor is not None:
+                for f in futures:
+                    f.cancel()
+
+    def add_task_results(self,
+                         game_log: list,
+                         winner: dict,
+                         timeouts: List[dict],
+                         profile: dict):
+        self.timeouts.append(timeouts)
+        if profile is not None:
+            self.profiles.append(profile)
+        return game_log, winner
+
+    def play(self,
+             executor: Executor = None,
+             progress: Callable[[int], None] = None):
+        log = []
+        for i, (game_log, winner) in enumerate(self.iter_games(executor)):
             if self.is_sim:
                 log.append(game_log)
+            result = {'winner': winner, 'seed': self.get_game_seed(i)}
+            if self.timeouts[i]:
+                result['timeouts'] = self.timeouts[i]
+            if self.profiler is not None:
+                result['profile'] = self.profiles[i]
+            log.append(result)
 
-            alive_robots = self.get_robots_alive()
-            if len(alive_robots) == 1:
-                winner_name = get_robot_name_from_object(alive_robots[0])
-                i = self.robots.index(alive_robots[0])
-                winner_owner = self.players[i]
-                winner = {'name': winner_name, 'owner': winner_owner}
-            log.append({'winner': winner})
+            if progress is not None:
+                progress(i + 1)
 
         return log
+
+
+def play_single_task(
+        rounds: int,
+        robots: List[RobotToUserModel],
+        is_sim: bool,
+        log_mode: str,
+        seed: int,
+        stalemate: str,
+        profile: bool,
+        sandbox: bool):
+    game = Game(rounds, 1, robots, is_sim, log_mode, seed, stalemate, profile,
+                sandbox)
+    game_log, winner = game.play_single()
+    profile = game.profiles[-1] if profile else None
+    return game_log, winner, game.timeouts[-1], profile
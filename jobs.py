@@ -0,0 +1,296 @@
+# global imports
+import asyncio
+from collections import OrderedDict, defaultdict
+from contextlib import suppress
+from heapq import heappop, heappush
+from itertools import count
+from threading import Condition, Event, Lock, Thread
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+# local imports
+from constants import *
+from models import *
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_FINISHED = 'finished'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobLimitReached(Exception):
+    pass
+
+
+class Job:
+    id: str
+    kind: str
+    owner: str
+    status: str
+    # set to ask a running job to stop, games check it between rounds
+    cancel_event: Event
+    done_event: Event
+    # what made the job fail
+    error: Optional[BaseException]
+    # scheduler the job was submitted to
+    scheduler: Optional['JobScheduler']
+
+    def __init__(self, kind: str, owner: str):
+        self.id = uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.status = JOB_QUEUED
+        self.error = None
+        self.scheduler = None
+        self.cancel_event = Event()
+        self.done_event = Event()
+        self.callbacks = []
+        self.lock = Lock()
+
+    @property
+    def is_done(self) -> bool:
+        return self.done_event.is_set()
+
+    def start(self):
+        self.status = JOB_RUNNING
+
+    def finish(self, result: Any):
+        self.status = JOB_FINISHED
+
+    def fail(self, error: BaseException = None):
+        self.error = error
+        self.status = JOB_FAILED
+
+    def cancel(self):
+        self.status = JOB_CANCELLED
+
+    def set_done(self):
+        with self.lock:
+            self.done_event.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback: Callable[['Job'], None]):
+        # callbacks run in the worker thread, or now if the job is done
+        with self.lock:
+            if not self.is_done:
+                self.callbacks.append(callback)
+                return
+        callback(self)
+
+    def to_job_model(self) -> JobModel:
+        return JobModel(id=self.id,
+                        kind=self.kind,
+                        owner=self.owner,
+                        status=self.status)
+
+
+class MatchJob(Job):
+    match_id: int
+    games: int
+    games_played: int
+    winner: Optional[dict]
+    seed: int
+    profile: bool
+    profiles: Optional[List[dict]]
+
+    def __init__(self,
+                 match_id: int,
+                 games: int,
+                 seed: int,
+                 owner: str,
+                 profile: bool = False):
+        super().__init__(JOB_MATCH, owner)
+        self.match_id = match_id
+        self.games = games
+        self.games_played = 0
+        self.winner = None
+        self.seed = seed
+        self.profile = profile
+        self.profiles = None
+
+    def update(self, games_played: int):
+        self.games_played = games_played
+
+    def finish(self, winner: Optional[dict]):
+        self.winner = winner
+        super().finish(winner)
+
+    def to_model(self) -> MatchJobModel:
+        return MatchJobModel(id=self.id,
+                             match_id=self.match_id,
+                             games=self.games,
+                             games_played=self.games_played,
+                             status=self.status,
+                             winner=self.winner,
+                             seed=self.seed,
+                             profiles=self.profiles)
+
+
+class SimulationJob(Job):
+    media_type: str
+    content: Optional[bytes]
+
+    def __init__(self, owner: str, media_type: str):
+        super().__init__(JOB_SIMULATION, owner)
+        self.media_type = media_type
+        self.content = None
+
+    def finish(self, content: bytes):
+        self.content = content
+        super().finish(content)
+
+
+class JobScheduler:
+    # fixed pool of worker threads over a bounded priority queue, threads
+    # keep jobs running whatever event loop submitted them
+    workers: int
+    queue_size: int
+    user_limit: int
+    keep_count: int
+    keep_seconds: float
+
+    def __init__(self,
+                 workers: int,
+                 queue_size: int,
+                 user_limit: int,
+                 keep_count: int = JOB_KEEP_COUNT,
+                 keep_seconds: float = JOB_KEEP_SECONDS):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.user_limit = user_limit
+        self.keep_count = keep_count
+        self.keep_seconds = keep_seconds
+        self.ready = Condition()
+        # (priority, order, job, target), cancelled jobs are dropped when
+        # they come out
+        self.queue = []
+        self.queued = 0
+        self.order = count()
+        # owner -> queued or running jobs
+        self.active = defaultdict(int)
+        # job id -> when it was done, oldest first
+        self.done = OrderedDict()
+        self.threads = []
+
+    def submit(self, job: Job, target: Callable[[Job], Any]):
+        with self.ready:
+            self.evict()
+            if self.queued >= self.queue_size:
+                raise JobQueueFull()
+            if self.active[job.owner] >= self.user_limit:
+                raise JobLimitReached()
+            self.active[job.owner] += 1
+            self.queued += 1
+            heappush(self.queue, (JOB_PRIORITIES[job.kind], next(self.order),
+                                  job, target))
+            all_jobs[job.id] = job
+            job.scheduler = self
+            self.start_workers()
+            self.ready.notify()
+
+    def start_workers(self):
+        while len(self.threads) < self.workers:
+            thread = Thread(target=self.run_worker, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def next_job(self):
+        with self.ready:
+            while True:
+                while not self.queue:
+                    self.ready.wait()
+                _, _, job, target = heappop(self.queue)
+                if job.status == JOB_QUEUED:
+                    self.queued -= 1
+                    job.start()
+                    return job, target
+
+    def run_worker(self):
+        while True:
+            job, target = self.next_job()
+            try:
+                job.finish(target(job))
+            except BaseException as e:
+                if job.cancel_event.is_set():
+                    job.cancel()
+                else:
+                    job.fail(e)
+            self.release(job)
+
+    def release(self, job: Job):
+        with self.ready:
+            self.active[job.owner] -= 1
+            self.done[job.id] = monotonic()
+            self.evict()
+        job.set_done()
+
+    def evict(self):
+        # called with the lock held
+        expired = monotonic() - self.keep_seconds
+        while self.done:
+            job_id, done_at = next(iter(self.done.items()))
+            if len(self.done) <= self.keep_count and done_at > expired:
+                break
+            del self.done[job_id]
+            all_jobs.pop(job_id, None)
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self.ready:
+            self.evict()
+            return all_jobs.get(job_id)
+
+    def forget(self, job: Job):
+        # results already handed over are not kept
+        with self.ready:
+            self.done.pop(job.id, None)
+            all_jobs.pop(job.id, None)
+
+    def cancel(self, job: Job) -> bool:
+        # queued jobs are cancelled now, running ones when the game sees it
+        with self.ready:
+            if job.is_done:
+                return False
+            job.cancel_event.set()
+            if job.status != JOB_QUEUED:
+                return True
+            self.queued -= 1
+            job.cancel()
+        self.release(job)
+        return True
+
+    def shutdown(self):
+        with self.ready:
+            jobs = [job for _, _, job, _ in self.queue]
+        for job in jobs:
+            self.cancel(job)
+        for job in list(all_jobs.values()):
+            job.cancel_event.set()
+
+
+async def wait_job(job: Job):
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def set_done(_: Job):
+        # the waiting request may be gone along with its loop
+        with suppress(RuntimeError):
+            loop.call_soon_threadsafe(
+                lambda: done.done() or done.set_result(None))
+
+    job.add_done_callback(set_done)
+    await done
+
+
+all_jobs: Dict[str, Job] = {}
+job_scheduler = JobScheduler(JOB_WORKERS, JOB_QUEUE_SIZE, JOB_USER_LIMIT)
+stream_scheduler = JobScheduler(SIMULATION_STREAM_WORKERS,
+                                SIMULATION_STREAM_QUEUE_SIZE,
+                                SIMULATION_STREAM_USER_LIMIT)
@@ -9,8 +9,10 @@ from authentication import *
 from constants import *
 from database import setup_db, get_db
 from database_utils import *
+from jobs import job_scheduler, stream_scheduler
 from room import all_rooms
-from router_match import router as router_match
+from router_job import router as router_job
+from router_match import router as router_match, match_executor
 from router_robot import router as router_robot
 from router_simulation import router as router_simulation
 from router_user import router as router_user
@@ -32,6 +34,7 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+app.include_router(router_job)
 app.include_router(router_match)
 app.include_router(router_robot)
 app.include_router(router_simulation)
@@ -50,6 +53,9 @@ async def app_startup():
 def shutdown_event():
     db = get_db()
     db_delete_useless_matches(db)
+    job_scheduler.shutdown()
+    stream_scheduler.shutdown()
+    match_executor.shutdown(cancel_futures=True)
 
 
 @app.websocket('/ws/{room_id}')
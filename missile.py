@@ -4,12 +4,31 @@ from utils import cos_d, sin_d, clamp
 from constants import *
 
 
+def get_missile_step(direction: int):
+    return (DISTANCE_MISSILE_ROUND * cos_d(direction),
+            DISTANCE_MISSILE_ROUND * sin_d(direction))
+
+
+MISSILE_STEPS = {d: get_missile_step(d) for d in range(360)}
+
+
 class Missile:
+    __slots__ = ('direction', 'distance', 'position', 'final_position',
+                 'is_active')
+
     def __init__(self,
                  direction: int,
                  distance: int,
                  position: Tuple[int, int],
                  final_position: Tuple[int, int]):
+        self.launch(direction, distance, position, final_position)
+
+    def launch(self,
+               direction: int,
+               distance: int,
+               position: Tuple[int, int],
+               final_position: Tuple[int, int]):
+        # also used to reuse a missile that already exploded
         self.direction = direction
         self.distance = distance
         self.position = position
@@ -17,12 +36,14 @@ class Missile:
         self.is_active = True
 
     def move(self):
-        direction = self.direction
-        change_x, change_y = cos_d(direction), sin_d(direction)
+        step = MISSILE_STEPS.get(self.direction)
+        if step is None:
+            step = get_missile_step(self.direction)
+        step_x, step_y = step
 
         x, y = self.position
-        x = clamp(0, round(x + (DISTANCE_MISSILE_ROUND * change_x)), 999)
-        y = clamp(0, round(y + (DISTANCE_MISSILE_ROUND * change_y)), 999)
+        x = clamp(0, round(x + step_x), 999)
+        y = clamp(0, round(y + step_y), 999)
 
         self.distance -= DISTANCE_MISSILE_ROUND
         if self.distance <= 0:
@@ -162,11 +162,32 @@ class MatchLeaveModel(BaseModel):
 
 class MatchStartModel(BaseModel):
     id: int
+    seed: Optional[int]
+    profile: bool = False
+
+
+class JobModel(BaseModel):
+    id: str
+    kind: str
+    owner: str
+    status: str
+
+
+class MatchJobModel(BaseModel):
+    id: str
+    match_id: int
+    games: int
+    games_played: int
+    status: str
+    winner: Optional[dict]
+    seed: int
+    profiles: Optional[List[dict]]
 
 
 class SimulationModel(BaseModel):
     rounds: int
     robots_names: List[str]
+    seed: Optional[int]
 
 
 """
@@ -0,0 +1,73 @@
+# global imports
+from functools import wraps
+import logging
+from time import perf_counter
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# phase -> methods timed for it
+GAME_PHASES = {
+    'round': ['play_round'],
+    'respond': ['respond_robots'],
+    'scan': ['scan_robots'],
+    'fire': ['fire_robots'],
+    'missiles': ['move_missiles'],
+    'damage': ['missile_damage'],
+    'movement': ['move_robots'],
+    'log': ['log_round_state'],
+}
+
+
+def get_timing_dict(timing: list):
+    seconds, calls = timing
+    return {'seconds': seconds, 'calls': calls}
+
+
+class GameProfiler:
+    # phase -> [seconds, calls]
+    phases: Dict[str, List]
+
+    def __init__(self):
+        self.phases = {}
+
+    def wrap(self, phase: str, method):
+        timing = self.phases.setdefault(phase, [0.0, 0])
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timing[0] += perf_counter() - start
+                timing[1] += 1
+        return timed
+
+    def instrument(self, instance, phases: Dict[str, List[str]]):
+        # timed methods shadow the class ones only on this instance, games
+        # without profiler run the plain methods
+        for phase, names in phases.items():
+            for name in names:
+                method = getattr(instance, name)
+                setattr(instance, name, self.wrap(phase, method))
+
+    def reset(self):
+        for timing in self.phases.values():
+            timing[0] = 0.0
+            timing[1] = 0
+
+    def to_dict(self, robots: List[dict]):
+        phases = {phase: get_timing_dict(timing)
+                  for phase, timing in self.phases.items()}
+        return {'phases': phases, 'robots': robots}
+
+
+def log_profile(profile: dict):
+    phases = ' '.join(f"{phase}={t['seconds']:.4f}s/{t['calls']}"
+                      for phase, t in profile['phases'].items())
+    logger.info('game phases %s', phases)
+    for r in profile['robots']:
+        calls = ' '.join(f"{method}={t['seconds']:.4f}s/{t['calls']}"
+                         for method, t in r['calls'].items())
+        logger.info('robot %s (%s) %s', r['name'], r['owner'], calls)
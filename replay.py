@@ -0,0 +1,154 @@
+# global imports
+import json
+import struct
+from typing import List
+
+# file layout:
+#   magic (4 bytes) | header size (uint32) | json header | rounds
+# every round is:
+#   missile count (uint16) | robot records | missile records
+# records are little-endian structs built from the header fields, a
+# field with a count (like '2H') is decoded as a tuple
+REPLAY_MAGIC = b'PYRR'
+REPLAY_VERSION = 1
+REPLAY_ROBOT_FIELDS = [['damage', 'B'],
+                       ['direction', 'H'],
+                       ['velocity', 'B'],
+                       ['position', '2H'],
+                       ['scanner_direction', 'H'],
+                       ['scanner_resolution', 'B']]
+REPLAY_MISSILE_FIELDS = [['direction', 'H'],
+                         ['position', '2H'],
+                         ['is_active', '?']]
+
+
+class ReplayEncodeError(ValueError):
+    pass
+
+
+prefix_struct = struct.Struct('<4sI')
+count_struct = struct.Struct('<H')
+
+
+def get_fields_struct(fields: list, repeat: int = 1):
+    return struct.Struct('<' + ''.join(code for _, code in fields) * repeat)
+
+
+def get_fields_sizes(fields: list):
+    return [struct.calcsize(f'<{code}') // struct.calcsize(f'<{code[-1]}')
+            for _, code in fields]
+
+
+def flatten_record(record: dict, fields: list):
+    # values are never rounded, a replay decodes to the same log
+    values = []
+    for name, code in fields:
+        value = record[name]
+        if code[-1] == '?':
+            values.append(bool(value))
+        elif isinstance(value, (tuple, list)):
+            values.extend(value)
+        else:
+            values.append(value)
+    return values
+
+
+def pack_record(record_struct: struct.Struct, values: list) -> bytes:
+    # floats and out of range values do not fit the record codes
+    try:
+        return record_struct.pack(*values)
+    except struct.error as e:
+        raise ReplayEncodeError(f'Invalid replay value: {e}')
+
+
+def build_record(values: tuple, fields: list, sizes: list):
+    record = {}
+    i = 0
+    for (name, _), size in zip(fields, sizes):
+        if size == 1:
+            record[name] = values[i]
+        else:
+            record[name] = tuple(values[i:i + size])
+        i += size
+    return record
+
+
+def encode_replay(results: list) -> bytes:
+    # results come from Game.play in simulation mode:
+    # [game_log, {'winner': ...}, game_log, {'winner': ...}, ...]
+    logs, winners = results[::2], results[1::2]
+    robots_count = max((len(r['robots']) for log in logs for r in log),
+                       default=0)
+    header = {
+        'version': REPLAY_VERSION,
+        'robots': robots_count,
+        'robot_fields': REPLAY_ROBOT_FIELDS,
+        'missile_fields': REPLAY_MISSILE_FIELDS,
+        'games': [{'rounds': len(log), **w}
+                  for log, w in zip(logs, winners)]
+    }
+    header_bytes = json.dumps(header).encode()
+
+    robots_struct = get_fields_struct(REPLAY_ROBOT_FIELDS, robots_count)
+    missile_struct = get_fields_struct(REPLAY_MISSILE_FIELDS)
+    chunks = [prefix_struct.pack(REPLAY_MAGIC, len(header_bytes)),
+              header_bytes]
+    for log in logs:
+        for r in log:
+            robots_values = []
+            for robot in r['robots']:
+                robots_values.extend(
+                    flatten_record(robot, REPLAY_ROBOT_FIELDS))
+
+            chunks.append(count_struct.pack(len(r['missiles'])))
+            chunks.append(pack_record(robots_struct, robots_values))
+            for missile in r['missiles']:
+                chunks.append(pack_record(
+                    missile_struct,
+                    flatten_record(missile, REPLAY_MISSILE_FIELDS)))
+
+    return b''.join(chunks)
+
+
+def decode_replay(data: bytes) -> List:
+    magic, header_size = prefix_struct.unpack_from(data)
+    if magic != REPLAY_MAGIC:
+        raise ValueError('Invalid replay')
+    offset = prefix_struct.size
+    header = json.loads(data[offset:offset + header_size])
+    offset += header_size
+
+    robot_fields = header['robot_fields']
+    missile_fields = header['missile_fields']
+    robot_sizes = get_fields_sizes(robot_fields)
+    missile_sizes = get_fields_sizes(missile_fields)
+    robot_struct = get_fields_struct(robot_fields)
+    missile_struct = get_fields_struct(missile_fields)
+
+    results = []
+    for game in header['games']:
+        log = []
+        for _ in range(game['rounds']):
+            missiles_count, = count_struct.unpack_from(data, offset)
+            offset += count_struct.size
+
+            robots = []
+            for _ in range(header['robots']):
+                values = robot_struct.unpack_from(data, offset)
+                offset += robot_struct.size
+                robots.append(build_record(values, robot_fields,
+                                           robot_sizes))
+
+            missiles = []
+            for _ in range(missiles_count):
+                values = missile_struct.unpack_from(data, offset)
+                offset += missile_struct.size
+                missiles.append(build_record(values, missile_fields,
+                                             missile_sizes))
+
+            log.append({'robots': robots, 'missiles': missiles})
+
+        results.append(log)
+        results.append({k: v for k, v in game.items() if k != 'rounds'})
+
+    return results
@@ -0,0 +1,50 @@
+# global imports
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, Optional
+
+# local imports
+from constants import *
+
+
+class ResultCache:
+    max_bytes: int
+    size: int
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.results = OrderedDict()
+        # results are stored by job workers and read by requests
+        self.lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self.lock:
+            result = self.results.get(key)
+            if result is not None:
+                self.results.move_to_end(key)
+            return result
+
+    def put(self, key: Hashable, result: bytes):
+        if len(result) > self.max_bytes:
+            return
+
+        with self.lock:
+            old = self.results.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.results[key] = result
+            self.size += len(result)
+
+            # drop least recently used results until it fits
+            while self.size > self.max_bytes:
+                _, evicted = self.results.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+            self.size = 0
+
+
+simulation_cache = ResultCache(SIMULATION_CACHE_BYTES)
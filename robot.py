@@ -1,8 +1,18 @@
 from constants import *
 from utils import clamp
 
+ROBOT_STATE_FIELDS = ('accel', 'damage', 'direction', 'velocity', 'position',
+                      'rounds_to_cannon_ready', 'cannon_direction',
+                      'cannon_distance', 'cannon_ready', 'cannon_fired',
+                      'scanner_direction', 'scanner_resolution',
+                      'scanner_result')
+
+
+class RobotState:
+    # engine side of a robot, kept apart from the user subclass so its
+    # attributes and overrides never get in the way of the engine
+    __slots__ = ROBOT_STATE_FIELDS
 
-class Robot:
     def __init__(self):
         # status variables
         self.accel = 0
@@ -23,6 +33,61 @@ class Robot:
         self.scanner_resolution = 0
         self.scanner_result = -1
 
+    def is_alive(self) -> bool:
+        return self.damage < 100
+
+    def is_cannon_ready(self) -> bool:
+        return self.cannon_ready
+
+    def make_damage(self, damage: int):
+        self.damage = clamp(0, self.damage + damage, 100)
+
+    def move(self, position: int):
+        x, y = position
+        self.position = clamp(0, x, 999), clamp(0, y, 999)
+
+    def update_accel(self):
+        velocity, accel = self.velocity, self.accel
+        if (accel - VAR_ACCEL) > velocity:
+            accel -= VAR_ACCEL
+        elif (accel + VAR_ACCEL) < velocity:
+            accel += VAR_ACCEL
+        else:
+            accel = velocity
+        self.accel = accel
+
+
+def state_property(name: str):
+    return property(lambda self: getattr(self.engine_state, name),
+                    lambda self, value: setattr(self.engine_state, name,
+                                                value))
+
+
+class Robot:
+    engine_state: RobotState
+
+    # status variables
+    accel = state_property('accel')
+    damage = state_property('damage')
+    direction = state_property('direction')
+    velocity = state_property('velocity')
+    position = state_property('position')
+
+    # cannon variables
+    rounds_to_cannon_ready = state_property('rounds_to_cannon_ready')
+    cannon_direction = state_property('cannon_direction')
+    cannon_distance = state_property('cannon_distance')
+    cannon_ready = state_property('cannon_ready')
+    cannon_fired = state_property('cannon_fired')
+
+    # scanner variables
+    scanner_direction = state_property('scanner_direction')
+    scanner_resolution = state_property('scanner_resolution')
+    scanner_result = state_property('scanner_result')
+
+    def __init__(self):
+        self.engine_state = RobotState()
+
     def initialize(self):
         pass
 
@@ -42,7 +107,7 @@ class Robot:
         return self.damage
 
     def is_alive(self) -> bool:
-        return self.damage < 100
+        return self.engine_state.is_alive()
 
     def drive(self, direction: int, velocity: int):
         if self.accel <= MAX_ACCEL_TO_TURN:
@@ -62,21 +127,13 @@ class Robot:
         self.cannon_distance = clamp(0, distance, 700)
 
     def is_cannon_ready(self) -> bool:
-        return self.cannon_ready
+        return self.engine_state.is_cannon_ready()
 
     def make_damage(self, damage: int):
-        self.damage = clamp(0, self.damage + damage, 100)
+        self.engine_state.make_damage(damage)
 
     def move(self, position: int):
-        x, y = position
-        self.position = clamp(0, x, 999), clamp(0, y, 999)
+        self.engine_state.move(position)
 
     def update_accel(self):
-        velocity, accel = self.velocity, self.accel
-        if (accel - VAR_ACCEL) > velocity:
-            accel -= VAR_ACCEL
-        elif (accel + VAR_ACCEL) < velocity:
-            accel += VAR_ACCEL
-        else:
-            accel = velocity
-        self.accel = accel
+        self.engine_state.update_accel()
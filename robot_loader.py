@@ -0,0 +1,99 @@
+# global imports
+from hashlib import sha256
+from importlib.util import MAGIC_NUMBER, module_from_spec, spec_from_loader
+import marshal
+from os import getpid, replace, stat
+from types import CodeType
+from typing import Dict, Optional, Tuple
+
+# local imports
+from constants import *
+from utils import camel_to_snake, ensure_directory
+
+# (owner, robot) -> (file version, robot class)
+robot_classes: Dict[Tuple[str, str], Tuple[Tuple[int, int], type]] = {}
+
+
+def get_robot_path(owner_name: str, robot_name: str):
+    return f'{ROBOTS_DIR}/{owner_name}/{camel_to_snake(robot_name)}.py'
+
+
+def get_robot_code_path(owner_name: str, robot_name: str):
+    return f'{ROBOTS_DIR}/{owner_name}/{camel_to_snake(robot_name)}.code'
+
+
+def get_code_hash(code: str):
+    return sha256(code.encode()).hexdigest()
+
+
+def get_robot_code_hash(owner_name: str, robot_name: str) -> Optional[str]:
+    try:
+        with open(get_robot_path(owner_name, robot_name)) as fd:
+            return get_code_hash(fd.read())
+    except OSError:
+        return None
+
+
+def compile_robot(owner_name: str, robot_name: str, code: str) -> CodeType:
+    return compile(code, get_robot_path(owner_name, robot_name), 'exec')
+
+
+def save_robot_code(owner_name: str,
+                    robot_name: str,
+                    code: str,
+                    code_object: CodeType = None):
+    if code_object is None:
+        code_object = compile_robot(owner_name, robot_name, code)
+
+    # magic number discards stores written by other python versions
+    content = marshal.dumps((MAGIC_NUMBER, get_code_hash(code), code_object))
+    path = get_robot_code_path(owner_name, robot_name)
+    ensure_directory(f'{ROBOTS_DIR}/{owner_name}')
+    tmp_path = f'{path}.{getpid()}.tmp'
+    with open(tmp_path, 'wb') as fd:
+        fd.write(content)
+    replace(tmp_path, path)
+    return code_object
+
+
+def load_robot_code(owner_name: str, robot_name: str) -> CodeType:
+    with open(get_robot_path(owner_name, robot_name)) as fd:
+        code = fd.read()
+
+    try:
+        with open(get_robot_code_path(owner_name, robot_name), 'rb') as fd:
+            magic, code_hash, code_object = marshal.loads(fd.read())
+        if magic == MAGIC_NUMBER and code_hash == get_code_hash(code):
+            return code_object
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    # store is missing or outdated, robot file was written by hand
+    return save_robot_code(owner_name, robot_name, code)
+
+
+def get_robot_version(owner_name: str, robot_name: str):
+    file_stat = stat(get_robot_path(owner_name, robot_name))
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def load_robot_class(owner_name: str, robot_name: str) -> type:
+    key = owner_name, robot_name
+    version = get_robot_version(owner_name, robot_name)
+    cached = robot_classes.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # run stored code, import system caches can hold older versions
+    module_name = f'{ROBOTS_DIR}.{owner_name}.{camel_to_snake(robot_name)}'
+    module = module_from_spec(spec_from_loader(module_name, loader=None))
+    module.__file__ = get_robot_path(owner_name, robot_name)
+    exec(load_robot_code(owner_name, robot_name), module.__dict__)
+
+    _class = getattr(module, robot_name)
+    robot_classes.update({key: (version, _class)})
+    return _class
+
+
+def invalidate_robot_class(owner_name: str, robot_name: str):
+    robot_classes.pop((owner_name, robot_name), None)
@@ -0,0 +1,111 @@
+# global imports
+import struct
+
+# local imports
+from robot import RobotState
+from utils import clamp
+
+# fixed size messages between the engine and an out of process robot
+#
+# engine -> robot, what the robot api can read (accel decides if drive can
+# turn, cannon_fired is cleared by the engine when the missile leaves):
+#   method (B) | position (2H) | damage (B) | velocity (B) | direction (H) |
+#   accel (B) | scanner_result (h) | cannon_ready (?) | cannon_fired (?)
+# robot -> engine, what drive, point_scanner and cannon set:
+#   ok (?) | has_commands (?) | direction (H) | velocity (B) |
+#   scanner_direction (H) | scanner_resolution (B) | cannon_fired (?) |
+#   cannon_direction (H) | cannon_distance (H) | seconds (d) | cpu (d)
+# robot -> engine once loaded: ready (?) | cpu (d)
+# cpu is the total cpu time of the robot process, seconds the call wall time
+SENSORS_STRUCT = struct.Struct('<B2HBBHBh??')
+COMMANDS_STRUCT = struct.Struct('<??HBHB?HHdd')
+READY_STRUCT = struct.Struct('<?d')
+
+METHODS = ['initialize', 'respond']
+METHOD_STOP = 255
+
+# fields robot code can change, everything else belongs to the engine
+COMMAND_FIELDS = ('direction', 'velocity', 'scanner_direction',
+                  'scanner_resolution', 'cannon_fired', 'cannon_direction',
+                  'cannon_distance')
+
+
+def pack_sensors(method: int, state: RobotState) -> bytes:
+    x, y = state.position
+    return SENSORS_STRUCT.pack(method, x, y, state.damage, state.velocity,
+                               state.direction, state.accel,
+                               state.scanner_result, state.cannon_ready,
+                               state.cannon_fired)
+
+
+def pack_stop() -> bytes:
+    return SENSORS_STRUCT.pack(METHOD_STOP, 0, 0, 0, 0, 0, 0, 0, False, False)
+
+
+def unpack_sensors(data: bytes, state: RobotState) -> int:
+    (method, x, y, state.damage, state.velocity, state.direction,
+     state.accel, state.scanner_result, state.cannon_ready,
+     state.cannon_fired) = SENSORS_STRUCT.unpack(data)
+    state.position = x, y
+    return method
+
+
+def sanitize_commands(state: RobotState):
+    # same bounds the robot api uses, robot code can set fields by hand
+    state.direction = int(state.direction) % 360
+    state.velocity = clamp(0, int(state.velocity), 100)
+    state.scanner_direction = int(state.scanner_direction) % 360
+    state.scanner_resolution = clamp(0, int(state.scanner_resolution), 10)
+    state.cannon_fired = bool(state.cannon_fired)
+    state.cannon_direction = int(state.cannon_direction) % 360
+    state.cannon_distance = clamp(0, int(state.cannon_distance), 700)
+
+
+def get_commands(state: RobotState) -> tuple:
+    return tuple(getattr(state, name) for name in COMMAND_FIELDS)
+
+
+def apply_commands(state: RobotState, previous: tuple) -> bool:
+    # commands written in place by robot code, the last valid ones are kept
+    # when they can not be used
+    try:
+        sanitize_commands(state)
+        return True
+    except (TypeError, ValueError, AttributeError, OverflowError):
+        for name, value in zip(COMMAND_FIELDS, previous):
+            setattr(state, name, value)
+        return False
+
+
+def pack_commands(ok: bool,
+                  state: RobotState,
+                  seconds: float,
+                  cpu: float) -> bytes:
+    try:
+        sanitize_commands(state)
+        return COMMANDS_STRUCT.pack(ok, True, state.direction, state.velocity,
+                                    state.scanner_direction,
+                                    state.scanner_resolution,
+                                    state.cannon_fired, state.cannon_direction,
+                                    state.cannon_distance, seconds, cpu)
+    except (TypeError, ValueError, AttributeError, OverflowError,
+            struct.error):
+        return COMMANDS_STRUCT.pack(False, False, 0, 0, 0, 0, False, 0, 0,
+                                    seconds, cpu)
+
+
+def unpack_commands(data: bytes, state: RobotState):
+    # returns (ok, seconds, cpu), the state only changes if commands were sent
+    (ok, has_commands, direction, velocity, scanner_direction,
+     scanner_resolution, cannon_fired, cannon_direction, cannon_distance,
+     seconds, cpu) = COMMANDS_STRUCT.unpack(data)
+    if has_commands:
+        # bounds are checked again, the child process is not trusted
+        state.direction = direction % 360
+        state.velocity = min(velocity, 100)
+        state.scanner_direction = scanner_direction % 360
+        state.scanner_resolution = min(scanner_resolution, 10)
+        state.cannon_fired = cannon_fired
+        state.cannon_direction = cannon_direction % 360
+        state.cannon_distance = min(cannon_distance, 700)
+    return ok, seconds, cpu
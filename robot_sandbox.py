@@ -0,0 +1,245 @@
+# global imports
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.connection import Connection
+import struct
+import os
+from time import perf_counter, process_time
+from typing import Dict, List, Optional
+
+# local imports
+from constants import *
+from robot import RobotState
+from robot_loader import load_robot_class
+from robot_protocol import *
+from robot_worker import CpuBudget
+from shared_ring import SharedRing
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# children are forked from a small server process that only imported this
+# module, never from the api process and its threads
+if 'forkserver' in get_all_start_methods():
+    sandbox_context = get_context('forkserver')
+    sandbox_context.set_forkserver_preload([__name__])
+else:
+    sandbox_context = get_context('spawn')
+
+try:
+    CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+except (AttributeError, ValueError, OSError):
+    CLOCK_TICKS = 100
+
+
+def set_limits(cpu_seconds: int, memory_bytes: int):
+    if resource is None:
+        return
+    # SIGXCPU at the soft limit, SIGKILL one second later
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+
+def get_process_cpu(pid: int) -> Optional[float]:
+    # utime and stime of another process, only linux has them in /proc
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as fd:
+            fields = fd.read().rsplit(b')', 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def receive_request(conn: Connection, requests: Optional[SharedRing]):
+    if requests is None:
+        return conn.recv_bytes()
+    while True:
+        data = requests.get(ROBOT_SANDBOX_POLL)
+        if data is not None:
+            return data
+        # nothing else is sent on the pipe, readable means it was closed
+        if conn.poll():
+            raise EOFError
+
+
+def send_reply(conn: Connection, replies: Optional[SharedRing], data: bytes):
+    if replies is None:
+        conn.send_bytes(data)
+    else:
+        replies.put(data)
+
+
+def run_sandbox(conn: Connection,
+                owner_name: str,
+                robot_name: str,
+                cpu_seconds: int,
+                memory_bytes: int,
+                rings: Optional[tuple] = None):
+    set_limits(cpu_seconds, memory_bytes)
+    requests = replies = None
+    if rings is not None:
+        requests, replies = (SharedRing(*args) for args in rings)
+    try:
+        robot = load_robot_class(owner_name, robot_name)()
+        robot.engine_state = RobotState()
+    except BaseException:
+        robot = None
+    # loading the robot is not charged to its first call
+    conn.send_bytes(READY_STRUCT.pack(robot is not None, process_time()))
+
+    while True:
+        try:
+            data = receive_request(conn, requests)
+        except EOFError:
+            break
+        # a robot that broke its own state only breaks its own process
+        method = unpack_sensors(data, robot.engine_state)
+        if method == METHOD_STOP:
+            break
+
+        start = perf_counter()
+        try:
+            getattr(robot, METHODS[method])()
+            ok = True
+        except BaseException:
+            ok = False
+        seconds = perf_counter() - start
+
+        send_reply(conn, replies, pack_commands(ok, robot.engine_state,
+                                                seconds, process_time()))
+
+
+class SandboxWorker:
+    state: RobotState
+    is_stopped: bool
+    is_ready: bool
+    profile: bool
+    # (requests, replies) when state goes through shared memory
+    rings: Optional[tuple]
+    cpu: CpuBudget
+    # total cpu time of the child when its last call finished
+    cpu_mark: float
+    # method -> [seconds, calls], only filled when profiling
+    timings: Dict[str, List]
+
+    def __init__(self,
+                 owner_name: str,
+                 robot_name: str,
+                 state: RobotState,
+                 profile: bool = False,
+                 transport: Optional[str] = None):
+        transport = transport or ROBOT_SANDBOX_TRANSPORT
+        if transport not in SANDBOX_TRANSPORTS:
+            raise ValueError(f'Transport {transport} does not exists')
+
+        self.state = state
+        self.is_stopped = False
+        self.is_ready = False
+        self.profile = profile
+        self.timings = {}
+        self.cpu = CpuBudget()
+        self.cpu_mark = 0.0
+        self.reply = None
+        self.rings = None
+        rings_args = None
+        if transport == TRANSPORT_SHM:
+            self.rings = (
+                SharedRing(SENSORS_STRUCT.size, ROBOT_SANDBOX_RING_SLOTS,
+                           sandbox_context.Semaphore(0)),
+                SharedRing(COMMANDS_STRUCT.size, ROBOT_SANDBOX_RING_SLOTS,
+                           sandbox_context.Semaphore(0)),
+            )
+            rings_args = tuple(r.attach_args() for r in self.rings)
+        self.conn, child_conn = sandbox_context.Pipe()
+        self.process = sandbox_context.Process(
+            target=run_sandbox,
+            args=(child_conn, owner_name, robot_name,
+                  ROBOT_SANDBOX_CPU, ROBOT_SANDBOX_MEMORY, rings_args),
+            daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self):
+        # the robot is loaded once, before its first call
+        if not self.conn.poll(ROBOT_SANDBOX_START_TIMEOUT):
+            return False
+        self.is_ready, self.cpu_mark = READY_STRUCT.unpack(
+            self.conn.recv_bytes())
+        return self.is_ready
+
+    def send(self, data: bytes) -> bool:
+        if self.rings is None:
+            self.conn.send_bytes(data)
+            return True
+        return self.rings[0].put(data)
+
+    def receive(self, timeout: float) -> Optional[bytes]:
+        if self.rings is None:
+            if not self.conn.poll(timeout):
+                return None
+            return self.conn.recv_bytes()
+        return self.rings[1].get(timeout)
+
+    def wait_reply(self, timeout: float) -> bool:
+        self.reply = self.receive(timeout)
+        return self.reply is not None
+
+    def get_call_cpu(self) -> Optional[float]:
+        if not self.process.is_alive():
+            raise EOFError
+        cpu = get_process_cpu(self.process.pid)
+        return None if cpu is None else cpu - self.cpu_mark
+
+    def call(self, method: str, timeout: float = ROBOT_TIMEOUT) -> bool:
+        if self.is_stopped:
+            return False
+
+        try:
+            if not self.is_ready and not self.wait_ready():
+                self.kill()
+                return False
+
+            if not self.send(pack_sensors(METHODS.index(method), self.state)):
+                self.kill()
+                return False
+            if not self.cpu.wait(self.wait_reply, self.get_call_cpu, timeout):
+                self.kill()
+                return False
+            ok, seconds, cpu = unpack_commands(self.reply, self.state)
+        except (OSError, EOFError, struct.error):
+            # the child died, most likely killed by its limits
+            self.kill()
+            return False
+
+        if self.profile:
+            timing = self.timings.setdefault(method, [0.0, 0])
+            timing[0] += seconds
+            timing[1] += 1
+
+        cpu, self.cpu_mark = cpu - self.cpu_mark, cpu
+        if not self.cpu.add(cpu):
+            self.stop()
+            return False
+        return ok
+
+    def kill(self):
+        self.process.kill()
+        self.stop()
+
+    def stop(self):
+        if self.is_stopped:
+            return
+        self.is_stopped = True
+        try:
+            self.send(pack_stop())
+        except OSError:
+            pass
+        self.conn.close()
+        self.process.join(ROBOT_SANDBOX_STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        if self.rings is not None:
+            for ring in self.rings:
+                ring.close()
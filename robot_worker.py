@@ -0,0 +1,214 @@
+# global imports
+import ctypes
+import gc
+from queue import SimpleQueue
+from threading import Event, Thread
+import time
+from time import perf_counter, thread_time
+from typing import Callable, Dict, List, Optional
+
+# local imports
+from constants import *
+from robot import Robot
+from robot_protocol import COMMAND_FIELDS, apply_commands, get_commands
+
+
+class RobotTimeout(Exception):
+    pass
+
+
+# total time spent collecting garbage, a collection stops every thread so
+# it is not charged to the robot that happened to be running
+gc_pauses = {'start': None, 'total': 0.0}
+
+
+def track_gc(phase: str, _: dict):
+    if phase == 'start':
+        gc_pauses['start'] = perf_counter()
+    elif gc_pauses['start'] is not None:
+        gc_pauses['total'] += perf_counter() - gc_pauses['start']
+        gc_pauses['start'] = None
+
+
+def get_gc_pauses():
+    # gc callbacks can release the gil in the middle of a collection
+    start = gc_pauses['start']
+    if start is None:
+        return gc_pauses['total']
+    return gc_pauses['total'] + perf_counter() - start
+
+
+gc.callbacks.append(track_gc)
+
+
+def get_thread_cpu(ident: int) -> Optional[float]:
+    # cpu clocks of other threads are not available everywhere
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+
+class CpuBudget:
+    # cpu and wall time used by one robot in one game
+    seconds: float
+    wall_seconds: float
+    max_call: float
+    calls: int
+    # why the robot was stopped, None while it is within its limits
+    exceeded: Optional[str]
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.wall_seconds = 0.0
+        self.max_call = 0.0
+        self.calls = 0
+        self.exceeded = None
+
+    def wait(self,
+             wait: Callable[[float], bool],
+             get_used: Callable[[], Optional[float]],
+             timeout: float) -> bool:
+        # get_used gives the cpu time of the running call, without a cpu
+        # clock it falls back to wall time
+        limit = min(timeout, ROBOT_CPU_BUDGET - self.seconds)
+        wall_limit = min(ROBOT_WALL_TIMEOUT,
+                         ROBOT_WALL_BUDGET - self.wall_seconds)
+        start = perf_counter()
+        paused = get_gc_pauses()
+        remaining = min(limit, wall_limit)
+        try:
+            while not wait(max(remaining, ROBOT_CPU_WAIT_MIN)):
+                # the collector stops every thread, its pauses are not
+                # charged
+                pause = get_gc_pauses() - paused
+                wall = perf_counter() - start - pause
+                used = get_used()
+                used = wall if used is None else used - pause
+                if used >= limit:
+                    self.add(used)
+                    if self.exceeded is None:
+                        self.exceeded = TIMEOUT_CALL
+                    return False
+                if wall >= wall_limit:
+                    self.exceeded = TIMEOUT_WALL
+                    return False
+                remaining = min(limit - used, wall_limit - wall)
+            return True
+        finally:
+            self.wall_seconds += (perf_counter() - start -
+                                  (get_gc_pauses() - paused))
+
+    def add(self, seconds: float) -> bool:
+        self.seconds += seconds
+        self.max_call = max(self.max_call, seconds)
+        self.calls += 1
+        if self.seconds >= ROBOT_CPU_BUDGET:
+            self.exceeded = TIMEOUT_BUDGET
+            return False
+        if self.wall_seconds >= ROBOT_WALL_BUDGET:
+            self.exceeded = TIMEOUT_WALL
+            return False
+        return True
+
+    def to_dict(self):
+        return {'seconds': self.seconds,
+                'wall': self.wall_seconds,
+                'max': self.max_call,
+                'calls': self.calls}
+
+
+class RobotWorker:
+    robot: Robot
+    is_stopped: bool
+    profile: bool
+    # method -> [seconds, calls], only filled when profiling
+    timings: Dict[str, List]
+    cpu: CpuBudget
+
+    def __init__(self, robot: Robot, profile: bool = False):
+        self.robot = robot
+        # the state the engine reads, robot code may replace its own
+        self.state = robot.engine_state
+        self.is_stopped = False
+        self.profile = profile
+        self.timings = {}
+        self.cpu = CpuBudget()
+        self.cpu_start = None
+        self.cpu_last = 0.0
+        self.failed = False
+        self.requests = SimpleQueue()
+        self.done = Event()
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            # a late timeout can land anywhere inside the loop
+            try:
+                method = self.requests.get()
+                if method is None:
+                    break
+                self.cpu_start = thread_time()
+                try:
+                    if self.profile:
+                        self.timed_call(method)
+                    else:
+                        getattr(self.robot, method)()
+                    self.failed = False
+                finally:
+                    self.cpu_last = thread_time() - self.cpu_start
+            except BaseException:
+                self.failed = True
+            self.done.set()
+
+    def timed_call(self, method: str):
+        # measured in the robot thread, only robot code is counted
+        timing = self.timings.setdefault(method, [0.0, 0])
+        start = perf_counter()
+        try:
+            getattr(self.robot, method)()
+        finally:
+            timing[0] += perf_counter() - start
+            timing[1] += 1
+
+    def call(self, method: str, timeout: float = ROBOT_TIMEOUT) -> bool:
+        if self.is_stopped:
+            return False
+
+        self.done.clear()
+        self.cpu_start = None
+        previous = get_commands(self.state)
+        self.requests.put(method)
+        if not self.cpu.wait(self.done.wait, self.get_call_cpu, timeout):
+            # same as a sandbox that never answered, commands are dropped
+            self.kill()
+            for name, value in zip(COMMAND_FIELDS, previous):
+                setattr(self.state, name, value)
+            return False
+        # same bounds as the sandbox, so logs and replays always fit
+        ok = apply_commands(self.state, previous)
+        if not self.cpu.add(self.cpu_last):
+            self.stop()
+            return False
+        return ok and not self.failed
+
+    def get_call_cpu(self) -> Optional[float]:
+        start = self.cpu_start
+        if start is None:
+            # the robot thread did not get to run yet
+            return 0.0
+        now = get_thread_cpu(self.thread.ident)
+        return None if now is None else now - start
+
+    def kill(self):
+        # same as func_timeout, raise inside the thread running robot code
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(
+            ctypes.c_ulong(self.thread.ident),
+            ctypes.py_object(RobotTimeout))
+        self.stop()
+
+    def stop(self):
+        if not self.is_stopped:
+            self.is_stopped = True
+            self.requests.put(None)
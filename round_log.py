@@ -0,0 +1,50 @@
+# global imports
+from typing import Iterable, Iterator
+
+# delta rounds only keep the fields that changed since the previous round,
+# missiles are compared with the ones still active in the previous round
+# (the engine drops inactive missiles and appends new ones at the end)
+
+
+def get_changed_fields(previous: dict, current: dict):
+    return {k: v for k, v in current.items() if previous.get(k) != v}
+
+
+def get_missiles_base(previous: dict):
+    return [m for m in previous['missiles'] if m['is_active']]
+
+
+def delta_round_state(previous: dict, current: dict, keyframe: bool):
+    if keyframe or previous is None:
+        return {'keyframe': True, **current}
+
+    robots = [get_changed_fields(p, c)
+              for p, c in zip(previous['robots'], current['robots'])]
+
+    base = get_missiles_base(previous)
+    missiles = [get_changed_fields(base[i] if i < len(base) else {}, m)
+                for i, m in enumerate(current['missiles'])]
+
+    return {'keyframe': False, 'robots': robots, 'missiles': missiles}
+
+
+def iter_full_rounds(log: Iterable[dict]) -> Iterator[dict]:
+    previous = None
+    for r in log:
+        if r['keyframe']:
+            current = {'robots': r['robots'], 'missiles': r['missiles']}
+        else:
+            robots = [{**p, **d}
+                      for p, d in zip(previous['robots'], r['robots'])]
+
+            base = get_missiles_base(previous)
+            missiles = [{**(base[i] if i < len(base) else {}), **d}
+                        for i, d in enumerate(r['missiles'])]
+            current = {'robots': robots, 'missiles': missiles}
+
+        yield current
+        previous = current
+
+
+def reconstruct_rounds(log: Iterable[dict]) -> list:
+    return list(iter_full_rounds(log))
@@ -0,0 +1,82 @@
+# global imports
+from fastapi import APIRouter, Depends, Response, status, HTTPException
+from typing import Any, Callable
+
+# local imports
+from authentication import get_current_user_name
+from jobs import *
+
+router = APIRouter(prefix='/job')
+
+
+def submit_job(job: Job,
+               target: Callable[[Job], Any],
+               scheduler: JobScheduler = job_scheduler):
+    # full queues are refused right away instead of piling up requests
+    try:
+        scheduler.submit(job, target)
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Job queue is full'
+        )
+    except JobLimitReached:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail='Too many jobs'
+        )
+
+
+def get_user_job(job_id: str, current_user: str):
+    # check if job exists
+    job = job_scheduler.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Job does not exists'
+        )
+
+    # check if user is the owner
+    if job.owner != current_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='User is not the owner'
+        )
+    return job
+
+
+@router.get('/status/{job_id}', response_model=JobModel)
+async def job_status(job_id: str,
+                     current_user: str = Depends(get_current_user_name)):
+    return get_user_job(job_id, current_user).to_job_model()
+
+
+@router.get('/result/{job_id}')
+async def job_result(job_id: str,
+                     current_user: str = Depends(get_current_user_name)):
+    job = get_user_job(job_id, current_user)
+
+    # check if job is finished
+    if job.status != JOB_FINISHED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Job is not finished'
+        )
+
+    if isinstance(job, SimulationJob):
+        return Response(content=job.content, media_type=job.media_type)
+    return job.to_model()
+
+
+@router.post('/cancel/{job_id}', response_model=JobModel)
+async def job_cancel(job_id: str,
+                     current_user: str = Depends(get_current_user_name)):
+    job = get_user_job(job_id, current_user)
+
+    # check if job is not done
+    if not job.scheduler.cancel(job):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Job is already done'
+        )
+    return job.to_job_model()
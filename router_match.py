@@ -1,7 +1,10 @@
 # global imports
 from collections import defaultdict
-from fastapi import APIRouter, Depends, status
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import APIRouter, BackgroundTasks, Depends, status
+from functools import partial
+from random import randrange
+from typing import Iterable, List, Optional
 
 # local imports
 from authentication import *
@@ -9,11 +12,18 @@ from constants import *
 from database import get_db
 from database_utils import *
 from game import Game
+from jobs import *
 from room import Room, match_room, all_rooms
 from models import *
+from robot_sandbox import sandbox_context
+from router_job import submit_job
 from utils import *
 
 router = APIRouter(prefix='/match')
+# workers must not be forked from the api process, a fork inherits the
+# forkserver of the sandbox without being able to use it
+match_executor = ProcessPoolExecutor(max_workers=MATCH_WORKERS,
+                                     mp_context=sandbox_context)
 
 
 @router.post("/create", status_code=status.HTTP_201_CREATED)
@@ -213,11 +223,62 @@ async def match_leave(match: MatchLeaveModel,
     return {}
 
 
-@router.post('/start')
+def get_match_winner(winners: Iterable[Optional[dict]]):
+    win_count = defaultdict(lambda: 0)
+    for game_winner in winners:
+        if game_winner:
+            winner_name, winner_owner = game_winner.values()
+            win_count[(winner_name, winner_owner)] += 1
+
+    winner = None
+    if len(win_count) != 0:
+        winner_robot = max(win_count, key=win_count.get)
+        winner_name, winner_owner = winner_robot
+        winner = {'name': winner_name, 'owner': winner_owner}
+    return winner
+
+
+async def run_match(job: MatchJob, room: Room, db: Database):
+    # game runs in a scheduler worker so the event loop keeps serving requests
+    await wait_job(job)
+    if job.status != JOB_FINISHED:
+        await room.win_notify(None)
+        return
+
+    # update stats winner
+    winner = job.winner
+    if winner is not None:
+        db_update_stats_won(db, winner['owner'], winner['name'])
+
+    await room.win_notify(winner)
+
+
+def play_match(match: MatchInDB, job: MatchJob):
+    # only the winner matters, games where nothing happens end early
+    game = Game(match.rounds, match.games, match.robots, False,
+                seed=job.seed, stalemate=MATCH_STALEMATE, profile=job.profile,
+                sandbox=ROBOT_SANDBOX, cancel=job.cancel_event)
+    winner = get_match_winner(iter_match_winners(game, job))
+    if job.profile:
+        job.profiles = game.profiles
+    return winner
+
+
+def iter_match_winners(game: Game, job: MatchJob):
+    # winners are counted as games finish, logs are never kept
+    for i, (_, winner) in enumerate(game.iter_games(match_executor)):
+        job.update(i + 1)
+        yield winner
+
+
+@router.post('/start', status_code=status.HTTP_202_ACCEPTED)
 async def match_start(match: MatchStartModel,
+                      background_tasks: BackgroundTasks,
                       current_user: str = Depends(get_current_user_name),
                       db: Database = Depends(get_db)):
     match_id = match.id
+    seed = match.seed
+    profile = match.profile
 
     # check if match exists
     match = db_read_match(db, match_id=match_id)
@@ -256,6 +317,12 @@ async def match_start(match: MatchStartModel,
             detail='Room does not exists'
         )
 
+    # queue job first, a full queue leaves the match untouched
+    if seed is None:
+        seed = randrange(GAME_SEED_MAX)
+    job = MatchJob(match_id, match.games, seed, current_user, profile)
+    submit_job(job, partial(play_match, match))
+
     # update database entry
     db_update_match_is_started(db, match_id, True)
 
@@ -263,27 +330,19 @@ async def match_start(match: MatchStartModel,
     for r in match.robots:
         db_update_stats_played(db, r.owner_name, r.name)
 
-    # create game, play and return results
-    game = Game(match.rounds, match.games, match.robots, False)
-    results_p = game.play()
-
-    win_count = defaultdict(lambda: 0)
-    for r in results_p:
-        game_winner = r.get('winner')
-        if game_winner:
-            winner_name, winner_owner = game_winner.values()
-            win_count[(winner_name, winner_owner)] += 1
-
+    # the winner is sent to the room when the job finishes
     room = all_rooms[room_id]
-    winner = None
-    if len(win_count) != 0:
-        winner_robot = max(win_count, key=win_count.get)
-        winner_name, winner_owner = winner_robot
-        winner = {'name': winner_name, 'owner': winner_owner}
+    background_tasks.add_task(run_match, job, room, db)
+    return {'job_id': job.id}
 
-    # update stats winner
-    if winner is not None:
-        db_update_stats_won(db, winner['owner'], winner['name'])
 
-    await room.win_notify(winner)
-    return {}
+@router.get('/status/{job_id}', response_model=MatchJobModel)
+async def match_status(job_id: str,
+                       _: str = Depends(get_current_user_name)):
+    job = job_scheduler.get_job(job_id)
+    if not isinstance(job, MatchJob):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Job does not exists'
+        )
+    return job.to_model()
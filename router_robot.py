@@ -7,6 +7,7 @@ from authentication import *
 from database import get_db
 from database_utils import *
 from models import *
+from robot_loader import *
 from utils import *
 
 router = APIRouter(prefix='/robot')
@@ -18,10 +19,21 @@ async def robot_create(robot: RobotCreateModel,
                        db: Database = Depends(get_db)):
     name, code, avatar = robot.dict().values()
 
-    # create python file from code
+    # compile code once, invalid code is rejected before saving
+    try:
+        code_object = compile_robot(current_user, name, code)
+    except (SyntaxError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid robot code'
+        )
+
+    # create python file and code store from code
     robot_dir = f'{ROBOTS_DIR}/{current_user}'
     robot_file = f'{camel_to_snake(name)}.py'
     save_robot(robot_dir, robot_file, code, overwrite=True)
+    save_robot_code(current_user, name, code, code_object)
+    invalidate_robot_class(current_user, name)
 
     robot_in_db = db_read_robot(db,
                                 owner_name=current_user,
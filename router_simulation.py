@@ -1,19 +1,41 @@
 # global imports
-from fastapi import APIRouter, Depends, status, HTTPException
+import asyncio
+from contextlib import closing, suppress
+from fastapi import APIRouter, Depends, Header, Response, status, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from functools import partial
+import json
+from queue import Empty, Full, Queue
+from threading import Event
+from time import monotonic
 
 # local imports
 from authentication import get_current_user_name
+from constants import *
 from models import SimulationModel, RobotToUserModel
 from game import Game
+from jobs import *
+from replay import ReplayEncodeError, encode_replay
+from result_cache import simulation_cache
+from robot_loader import get_robot_code_hash
+from router_job import submit_job
 
 router = APIRouter(prefix='/simulation')
 
 
-@router.post('/create')
-async def simulation_create(
-        simulation: SimulationModel,
-        current_user: str = Depends(get_current_user_name)):
-    rounds, robots_names = simulation.dict().values()
+class StreamClosed(Exception):
+    pass
+
+
+def check_simulation(simulation: SimulationModel, log: str):
+    rounds, robots_names = simulation.rounds, simulation.robots_names
+
+    # check if log mode is valid
+    if log not in LOG_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Invalid log mode'
+        )
 
     # check if simulation has valid number of robots
     if len(robots_names) > 4:
@@ -41,9 +63,182 @@ async def simulation_create(
             detail='Rounds must be between 1 and 10000'
         )
 
-    robots_for_simulation = [RobotToUserModel(name=r, owner_name=current_user)
-                             for r in robots_names]
 
-    game = Game(simulation.rounds, 1, robots_for_simulation, True)
+def get_simulation_key(simulation: SimulationModel,
+                       owner_name: str,
+                       log_mode: str,
+                       is_replay: bool):
+    # names are part of the results (winner), code hashes catch updates
+    robots = tuple((name, get_robot_code_hash(owner_name, name))
+                   for name in simulation.robots_names)
+    return (owner_name, robots, simulation.rounds, simulation.seed,
+            ENGINE_VERSION, log_mode, is_replay)
+
+
+class SimulationStream:
+    # the game runs as a job and fills a bounded queue, the event loop is
+    # woken up for new rounds so reading never holds a thread
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.rounds = Queue(maxsize=SIMULATION_STREAM_BUFFER)
+        self.closed = Event()
+        self.ready = asyncio.Event()
+        self.deadline = None
+
+    def wake(self, *_):
+        # the request may be gone along with its loop
+        with suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(self.ready.set)
+
+    def put(self, round_log: dict):
+        # waits for the client to read, gives up if the stream was closed
+        # or took too long
+        while not self.closed.is_set() and monotonic() < self.deadline:
+            try:
+                self.rounds.put(round_log, timeout=SIMULATION_STREAM_POLL)
+                self.wake()
+                return
+            except Full:
+                pass
+        raise StreamClosed()
+
+    def play(self, game: Game, _: Job):
+        self.deadline = monotonic() + SIMULATION_STREAM_TIMEOUT
+        try:
+            with closing(game.iter_rounds()) as game_rounds:
+                for round_log in game_rounds:
+                    self.put(round_log)
+            result = {'winner': game.get_winner(), 'seed': game.seed}
+            if game.timeouts[-1]:
+                result['timeouts'] = game.timeouts[-1]
+            self.put(result)
+        except StreamClosed:
+            pass
+
+    async def iter_lines(self, job: Job):
+        job.add_done_callback(self.wake)
+        try:
+            while True:
+                try:
+                    round_log = self.rounds.get_nowait()
+                except Empty:
+                    # every round is queued before the job is done
+                    if job.is_done:
+                        break
+                    await self.ready.wait()
+                    self.ready.clear()
+                    continue
+                yield json.dumps(round_log) + '\n'
+        finally:
+            self.closed.set()
+            stream_scheduler.cancel(job)
+            await wait_job(job)
+            stream_scheduler.forget(job)
+
+
+def start_stream(job: Job, game: Game):
+    # streams wait for their clients, they do not hold the job workers
+    stream = SimulationStream(asyncio.get_running_loop())
+    submit_job(job, partial(stream.play, game), stream_scheduler)
+    return stream.iter_lines(job)
+
+
+def play_simulation(game: Game, is_replay: bool, key: tuple, _: Job):
     results = game.play()
-    return results
+
+    if is_replay:
+        content = encode_replay(results)
+    else:
+        content = JSONResponse(results).body
+
+    if key is not None:
+        simulation_cache.put(key, content)
+    return content
+
+
+@router.post('/create')
+async def simulation_create(
+        simulation: SimulationModel,
+        format: str = SIMULATION_FORMAT_JSON,
+        log: str = LOG_FULL,
+        profile: bool = False,
+        background: bool = False,
+        accept: str = Header(None),
+        current_user: str = Depends(get_current_user_name)):
+    # check if result format is valid
+    if format not in SIMULATION_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Invalid format'
+        )
+
+    check_simulation(simulation, log)
+
+    robots_for_simulation = [RobotToUserModel(name=r, owner_name=current_user)
+                             for r in simulation.robots_names]
+
+    # compact binary replay if asked by query or accept header, replays
+    # always hold full rounds
+    is_replay = (format == SIMULATION_FORMAT_REPLAY or
+                 REPLAY_MEDIA_TYPE in (accept or ''))
+    log_mode = LOG_FULL if is_replay else log
+    media_type = REPLAY_MEDIA_TYPE if is_replay else JSONResponse.media_type
+
+    # only seeded simulations can be repeated, timings never do
+    key = None
+    if simulation.seed is not None and not profile:
+        key = get_simulation_key(simulation, current_user, log_mode,
+                                 is_replay)
+        cached = simulation_cache.get(key)
+        if cached is not None:
+            return Response(content=cached, media_type=media_type)
+
+    job = SimulationJob(current_user, media_type)
+    game = Game(simulation.rounds, 1, robots_for_simulation, True,
+                log_mode=log_mode, seed=simulation.seed, profile=profile,
+                sandbox=ROBOT_SANDBOX, cancel=job.cancel_event)
+    submit_job(job, partial(play_simulation, game, is_replay, key))
+
+    # background jobs are read later from /job/result
+    if background:
+        return JSONResponse({'job_id': job.id},
+                            status_code=status.HTTP_202_ACCEPTED)
+
+    await wait_job(job)
+    # the result goes out with this response, nobody asks for it later
+    job_scheduler.forget(job)
+    if job.status == JOB_CANCELLED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Simulation was cancelled'
+        )
+    if isinstance(job.error, ReplayEncodeError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Simulation can not be saved as replay'
+        )
+    if job.status != JOB_FINISHED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail='Simulation failed'
+        )
+    return Response(content=job.content, media_type=media_type)
+
+
+@router.post('/stream')
+async def simulation_stream(
+        simulation: SimulationModel,
+        log: str = LOG_FULL,
+        current_user: str = Depends(get_current_user_name)):
+    check_simulation(simulation, log)
+
+    robots_for_simulation = [RobotToUserModel(name=r, owner_name=current_user)
+                             for r in simulation.robots_names]
+
+    # one json line per round, last line has the winner
+    job = SimulationJob(current_user, SIMULATION_STREAM_MEDIA_TYPE)
+    game = Game(simulation.rounds, 1, robots_for_simulation, True,
+                log_mode=log, seed=simulation.seed, sandbox=ROBOT_SANDBOX,
+                cancel=job.cancel_event)
+    return StreamingResponse(start_stream(job, game),
+                             media_type=SIMULATION_STREAM_MEDIA_TYPE)
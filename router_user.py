@@ -7,6 +7,7 @@ from authentication import *
 from database import get_db
 from database_utils import *
 from models import *
+from robot_loader import save_robot_code
 from send_email import send_validation_code, send_recover_code
 from utils import *
 
@@ -71,6 +72,7 @@ async def user_create(user: UserCreateModel,
     for robot_name, code in DEFAULT_ROBOTS.items():
         file_name = f'{camel_to_snake(robot_name)}.py'
         save_robot(robots_dir, file_name, code)
+        save_robot_code(name, robot_name, code)
         db_create_robot(db, owner_name=name, robot_name=robot_name)
         db_create_stats(db, name, robot_name)
     return {}
@@ -0,0 +1,68 @@
+# global imports
+from multiprocessing.shared_memory import SharedMemory
+import struct
+from typing import Optional
+
+# head (written by the producer) | tail (written by the consumer) | slots
+RING_HEADER = struct.Struct('<QQ')
+RING_COUNTER = struct.Struct('<Q')
+
+
+class SharedRing:
+    # single producer single consumer ring of fixed size messages, each
+    # counter only has one writer so no lock is needed, the semaphore counts
+    # published messages and wakes the consumer up
+    message_size: int
+    slots: int
+
+    def __init__(self,
+                 message_size: int,
+                 slots: int,
+                 semaphore,
+                 name: Optional[str] = None):
+        self.message_size = message_size
+        self.slots = slots
+        self.semaphore = semaphore
+        self.is_owner = name is None
+        if self.is_owner:
+            size = RING_HEADER.size + message_size * slots
+            self.memory = SharedMemory(create=True, size=size)
+            RING_HEADER.pack_into(self.memory.buf, 0, 0, 0)
+        else:
+            # children share the resource tracker of the engine process,
+            # only the creator unlinks the segment
+            self.memory = SharedMemory(name=name)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def attach_args(self):
+        return self.message_size, self.slots, self.semaphore, self.name
+
+    def put(self, data: bytes) -> bool:
+        buf = self.memory.buf
+        head, tail = RING_HEADER.unpack_from(buf, 0)
+        if head - tail >= self.slots:
+            return False
+        offset = RING_HEADER.size + (head % self.slots) * self.message_size
+        buf[offset:offset + self.message_size] = data
+        # the message is written before the head moves past it
+        RING_COUNTER.pack_into(buf, 0, head + 1)
+        self.semaphore.release()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        if not self.semaphore.acquire(timeout=timeout):
+            return None
+        buf = self.memory.buf
+        tail = RING_COUNTER.unpack_from(buf, RING_COUNTER.size)[0]
+        offset = RING_HEADER.size + (tail % self.slots) * self.message_size
+        data = bytes(buf[offset:offset + self.message_size])
+        RING_COUNTER.pack_into(buf, RING_COUNTER.size, tail + 1)
+        return data
+
+    def close(self):
+        self.memory.close()
+        if self.is_owner:
+            self.memory.unlink()
@@ -0,0 +1,86 @@
+# global imports
+import random
+import pytest
+
+# local imports
+from constants import *
+from game import Game
+from robot import Robot
+from utils import *
+
+
+def reference_sanitize(game: Game, positions: list):
+    # resolution used before cells were indexed, restarts on every fix
+    i = 0
+    while i < len(positions):
+        j = next((j for j in range(i)
+                  if positions[i][1] == positions[j][1]), -1)
+        if j != -1:
+            game.fix_position(i, j, positions)
+            i = 0
+        else:
+            i += 1
+
+
+def create_game(directions: list):
+    game = Game(GAME_ROUNDS, 1, [], False)
+    game.robots = []
+    for direction in directions:
+        robot = Robot()
+        robot.direction = direction
+        game.robots.append(robot)
+    game.states = [r.engine_state for r in game.robots]
+    return game
+
+
+def random_positions(rand: random.Random, n: int):
+    # small board so that robots pile up
+    positions = []
+    for _ in range(n):
+        initial = rand.randrange(0, 4), rand.randrange(0, 4)
+        final = initial
+        if rand.random() < 0.7:
+            final = rand.randrange(0, 4), rand.randrange(0, 4)
+        positions.append((initial, final))
+    return positions
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_same_as_reference(seed):
+    rand = random.Random(seed)
+    for _ in range(50):
+        n = rand.randrange(2, 9)
+        directions = [rand.randrange(0, 360) for _ in range(n)]
+        positions = random_positions(rand, n)
+
+        expected_game = create_game(directions)
+        expected = list(positions)
+        reference_sanitize(expected_game, expected)
+
+        game = create_game(directions)
+        result = list(positions)
+        game.sanitize_positions(result)
+
+        assert result == expected
+        assert ([r.damage for r in game.robots] ==
+                [r.damage for r in expected_game.robots])
+
+
+def test_no_collisions():
+    game = create_game([0, 0, 0])
+    positions = [((0, 0), (1, 0)), ((5, 5), (6, 5)), ((9, 9), (9, 9))]
+    result = list(positions)
+    game.sanitize_positions(result)
+
+    assert result == positions
+    assert [r.damage for r in game.robots] == [0, 0, 0]
+
+
+def test_pile_up_is_resolved():
+    n = 50
+    game = create_game([0] * n)
+    positions = [((i, 0), (100, 0)) for i in range(n)]
+    game.sanitize_positions(positions)
+
+    finals = [final for _, final in positions]
+    assert len(set(finals)) == n
@@ -0,0 +1,93 @@
+# local imports
+from constants import *
+from game import Game
+from missile import Missile
+from robot import Robot
+from utils import *
+
+
+def create_game(positions: list, explosions: list):
+    game = Game(GAME_ROUNDS, 1, [], False)
+    game.robots = []
+    for position in positions:
+        robot = Robot()
+        robot.position = position
+        game.robots.append(robot)
+    game.states = [r.engine_state for r in game.robots]
+    game.missiles = [Missile(0, 0, p, p) for p in explosions]
+    return game
+
+
+def test_same_damage_as_rounded_distance():
+    for squared_distance in range(0, 2000):
+        distance = round(squared_distance**0.5)
+        expected = 0
+        if distance <= 5:
+            expected = DAMAGE_MISSIL_MAX
+        elif distance <= 20:
+            expected = DAMAGE_MISSIL_MED
+        elif distance <= 40:
+            expected = DAMAGE_MISSIL_MIN
+
+        assert get_missile_damage(squared_distance) == expected
+
+
+def test_every_robot_in_range_is_damaged():
+    game = create_game([(100, 100), (110, 100), (130, 100), (500, 500)],
+                       [(100, 100)])
+    game.missile_damage()
+
+    assert [r.damage for r in game.robots] == [DAMAGE_MISSIL_MAX,
+                                               DAMAGE_MISSIL_MED,
+                                               DAMAGE_MISSIL_MIN,
+                                               0]
+    assert not game.missiles[0].is_active
+
+
+def test_explosions_add_up():
+    game = create_game([(100, 100), (900, 900)],
+                       [(100, 100), (103, 100), (900, 100)])
+    game.missile_damage()
+
+    assert game.robots[0].damage == 2 * DAMAGE_MISSIL_MAX
+    assert game.robots[1].damage == 0
+    assert not any(m.is_active for m in game.missiles)
+
+
+def test_dead_robots_are_not_damaged():
+    game = create_game([(100, 100), (100, 101)], [(100, 100)])
+    game.robots[0].damage = 100
+    game.robots[1].damage = 95
+    game.missile_damage()
+
+    assert [r.damage for r in game.robots] == [100, 100]
+
+
+def test_flying_missiles_do_not_explode():
+    game = create_game([(100, 100)], [])
+    game.missiles = [Missile(0, 100, (100, 100), (200, 100))]
+    game.missile_damage()
+
+    assert game.robots[0].damage == 0
+    assert game.missiles[0].is_active
+
+
+def test_exploded_missiles_are_reused():
+    game = create_game([(100, 100)], [(500, 500), (600, 600)])
+    exploded = list(game.missiles)
+    game.missile_damage()
+    game.remove_inactive_missiles()
+
+    assert game.missiles == []
+    assert game.spare_missiles == exploded
+
+    robot = game.states[0]
+    robot.cannon_ready = True
+    robot.cannon_fired = True
+    robot.cannon_distance = 100
+    game.fire(robot)
+
+    assert game.missiles[0] in exploded
+    assert game.missiles[0].is_active
+    assert game.missiles[0].final_position == (200, 100)
+    assert len(game.spare_missiles) == 1
@@ -0,0 +1,117 @@
+# global imports
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event
+import pytest
+
+# local imports
+from constants import *
+from game import Game, GameCancelled
+from models import RobotToUserModel
+from utils import *
+
+
+@pytest.fixture(scope='module')
+def setup():
+    username = 'GamePlayName'
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    for robot_name, code in DEFAULT_ROBOTS.items():
+        file_name = f'{camel_to_snake(robot_name)}.py'
+        save_robot(robots_dir, file_name, code)
+    yield username
+    remove_dir(robots_dir)
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_parallel_winners(setup, executor):
+    # the missing robot starts dead, so Default1 wins every game
+    robots = [RobotToUserModel(name='Default1', owner_name=setup),
+              RobotToUserModel(name='Missing', owner_name=setup)]
+    game = Game(GAME_ROUNDS, 10, robots, False, seed=7)
+    results = game.play(executor=executor)
+
+    winner = {'name': 'Default1', 'owner': setup}
+    assert results == [{'winner': winner, 'seed': 7 + i} for i in range(10)]
+
+
+def test_parallel_simulation(setup, executor):
+    robots = [RobotToUserModel(name=n, owner_name=setup)
+              for n in DEFAULT_ROBOTS]
+    game = Game(GAME_ROUNDS, 3, robots, True)
+    results = game.play(executor=executor)
+
+    assert len(results) == 6
+    for game_log, game_result in zip(results[::2], results[1::2]):
+        assert 0 < len(game_log) <= GAME_ROUNDS
+        assert 'winner' in game_result
+
+
+def test_parallel_games_are_independent(setup, executor):
+    robots = [RobotToUserModel(name=n, owner_name=setup)
+              for n in DEFAULT_ROBOTS]
+    game = Game(1, 4, robots, True)
+    results = game.play(executor=executor)
+
+    first_rounds = [str(game_log[0]) for game_log in results[::2]]
+    assert len(set(first_rounds)) > 1
+
+
+def test_iter_rounds_is_lazy(setup):
+    robots = [RobotToUserModel(name=n, owner_name=setup)
+              for n in DEFAULT_ROBOTS]
+    game = Game(GAME_ROUNDS, 1, robots, True)
+    rounds = game.iter_rounds()
+    first = [next(rounds) for _ in range(5)]
+    rounds.close()
+
+    assert len(first) == 5
+    assert all(w.is_stopped for w in game.workers)
+
+
+def test_iter_games(setup):
+    robots = [RobotToUserModel(name='Default1', owner_name=setup),
+              RobotToUserModel(name='Missing', owner_name=setup)]
+    game = Game(GAME_ROUNDS, 3, robots, True)
+
+    winner = {'name': 'Default1', 'owner': setup}
+    for game_log, game_winner in game.iter_games():
+        assert len(game_log) == 1
+        assert game_winner == winner
+
+
+def test_same_seed_same_games(setup, executor):
+    robots = [RobotToUserModel(name=n, owner_name=setup)
+              for n in DEFAULT_ROBOTS]
+    sequential = Game(GAME_ROUNDS, 3, robots, True, seed=1234).play()
+    parallel = Game(GAME_ROUNDS, 3, robots, True, seed=1234).play(
+        executor=executor)
+
+    assert sequential == parallel
+    assert [r['seed'] for r in parallel[1::2]] == [1234, 1235, 1236]
+
+
+def test_game_seed_replays_single_game(setup):
+    robots = [RobotToUserModel(name=n, owner_name=setup)
+              for n in DEFAULT_ROBOTS]
+    match = Game(GAME_ROUNDS, 3, robots, True, seed=99).play()
+    single = Game(GAME_ROUNDS, 1, robots, True, seed=101).play()
+
+    assert single[0] == match[4]
+
+
+def test_cancel_between_rounds(setup):
+    robots = [RobotToUserModel(name=n, owner_name=setup)
+              for n in DEFAULT_ROBOTS]
+    cancel = Event()
+    game = Game(GAME_ROUNDS, 1, robots, True, cancel=cancel)
+    rounds = game.iter_rounds()
+    next(rounds)
+    cancel.set()
+
+    with pytest.raises(GameCancelled):
+        next(rounds)
+    assert all(w.is_stopped for w in game.workers)
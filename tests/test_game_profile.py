@@ -0,0 +1,103 @@
+# global imports
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import pytest
+
+# local imports
+from constants import *
+from game import Game
+from models import RobotToUserModel
+from profiler import GAME_PHASES
+from utils import *
+
+
+@pytest.fixture(scope='module')
+def setup():
+    username = 'GameProfileName'
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    for robot_name, code in DEFAULT_ROBOTS.items():
+        file_name = f'{camel_to_snake(robot_name)}.py'
+        save_robot(robots_dir, file_name, code)
+    yield username
+    remove_dir(robots_dir)
+
+
+def create_game(setup, profile, games=1):
+    robots = [RobotToUserModel(name=n, owner_name=setup)
+              for n in DEFAULT_ROBOTS]
+    return Game(GAME_ROUNDS, games, robots, True, seed=3,
+                profile=profile)
+
+
+def test_disabled_runs_plain_methods(setup):
+    game = create_game(setup, False)
+    results = game.play()
+
+    assert 'play_round' not in vars(game)
+    assert 'scan_robots' not in vars(game)
+    assert 'profile' not in results[1]
+    assert game.profiles == []
+
+
+def test_phases(setup):
+    game = create_game(setup, True)
+    results = game.play()
+    rounds = len(results[0])
+    profile = results[1]['profile']
+
+    assert profile['phases']['round']['calls'] == rounds
+    assert profile['phases']['respond']['calls'] == rounds
+    assert profile['phases']['scan']['calls'] == rounds
+    assert set(GAME_PHASES) <= set(profile['phases'])
+    assert all(t['seconds'] >= 0 for t in profile['phases'].values())
+
+
+def test_robots(setup):
+    game = create_game(setup, True)
+    results = game.play()
+    profile = results[1]['profile']
+
+    assert [(r['name'], r['owner']) for r in profile['robots']] == \
+        [(n, setup) for n in DEFAULT_ROBOTS]
+    for r in profile['robots']:
+        assert r['calls']['initialize']['calls'] == 1
+        assert 0 < r['calls']['respond']['calls'] <= len(results[0])
+
+
+def test_profile_every_game(setup):
+    game = create_game(setup, True, games=3)
+    results = game.play()
+
+    assert len(game.profiles) == 3
+    assert [r['profile'] for r in results[1::2]] == game.profiles
+
+
+def test_play_twice(setup):
+    game = create_game(setup, True, games=2)
+    game.play()
+    results = game.play()
+
+    assert len(game.profiles) == 2
+    assert len(game.timeouts) == 2
+    assert [r['profile'] for r in results[1::2]] == game.profiles
+
+
+def test_parallel_profiles(setup):
+    game = create_game(setup, True, games=2)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = game.play(executor=executor)
+
+    assert len(game.profiles) == 2
+    assert all(r['profile']['phases']['round']['calls'] > 0
+               for r in results[1::2])
+
+
+def test_logged(setup, caplog):
+    game = create_game(setup, True)
+    with caplog.at_level(logging.INFO, logger='profiler'):
+        game.play()
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any(m.startswith('game phases round=') for m in messages)
+    assert sum(m.startswith('robot ') for m in messages) == \
+        len(DEFAULT_ROBOTS)
@@ -0,0 +1,121 @@
+# global imports
+from math import gcd
+import random
+from shapely.geometry import Point, Polygon
+import pytest
+
+# local imports
+from constants import *
+from game import Game
+from robot import Robot
+from utils import *
+
+
+def shapely_scan(robot: Robot, robots: list):
+    direction = robot.scanner_direction
+    resolution = robot.scanner_resolution
+    x, y = robot.position
+    x2 = round(x + (SCANNER_DISTANCE * cos_d(direction + resolution)))
+    y2 = round(y + (SCANNER_DISTANCE * sin_d(direction + resolution)))
+    x3 = round(x + (SCANNER_DISTANCE * cos_d(direction - resolution)))
+    y3 = round(y + (SCANNER_DISTANCE * sin_d(direction - resolution)))
+    area = Polygon([(x, y), (x2, y2), (x3, y3)])
+    robots_in_scope = [r for r in robots if area.contains(Point(r.position))]
+    scanner_result = -1
+    if len(robots_in_scope) > 0:
+        scanner_result = min([
+            get_distance(robot.position, r.position)
+            for r in robots_in_scope
+        ])
+    return scanner_result
+
+
+def create_robot(position, direction=0, resolution=0):
+    robot = Robot()
+    robot.position = position
+    robot.point_scanner(direction, resolution)
+    return robot
+
+
+def scan_result(scanner: Robot, targets: list):
+    game = Game(GAME_ROUNDS, 1, [], True)
+    game.robots = [scanner, *targets]
+    game.states = [r.engine_state for r in game.robots]
+    game.scan(scanner.engine_state)
+    return scanner.scanner_result
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_scans(seed):
+    rand = random.Random(seed)
+    for _ in range(200):
+        position = (rand.randrange(0, 1000), rand.randrange(0, 1000))
+        scanner = create_robot(position,
+                               rand.randrange(0, 360),
+                               rand.randrange(0, 11))
+        targets = [create_robot((rand.randrange(0, 1000),
+                                 rand.randrange(0, 1000)))
+                   for _ in range(rand.randrange(1, 4))]
+
+        expected = shapely_scan(scanner, [scanner, *targets])
+        assert scan_result(scanner, targets) == expected
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_border_scans(seed):
+    # targets placed on the scanner edges and around them
+    rand = random.Random(seed)
+    for _ in range(200):
+        x, y = rand.randrange(0, 1000), rand.randrange(0, 1000)
+        direction = rand.randrange(0, 360)
+        resolution = rand.randrange(0, 11)
+        scanner = create_robot((x, y), direction, resolution)
+
+        edge = direction + rand.choice([resolution, -resolution])
+        distance = rand.randrange(0, 1000)
+        ex = round(x + distance * cos_d(edge)) + rand.randrange(-1, 2)
+        ey = round(y + distance * sin_d(edge)) + rand.randrange(-1, 2)
+        targets = [create_robot((ex, ey))]
+
+        expected = shapely_scan(scanner, [scanner, *targets])
+        assert scan_result(scanner, targets) == expected
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_lattice_points_on_edges(seed):
+    rand = random.Random(seed)
+    for _ in range(100):
+        x, y = rand.randrange(0, 1000), rand.randrange(0, 1000)
+        direction = rand.randrange(0, 360)
+        resolution = rand.randrange(1, 11)
+        scanner = create_robot((x, y), direction, resolution)
+
+        edge = direction + rand.choice([resolution, -resolution])
+        dx = round(x + SCANNER_DISTANCE * cos_d(edge)) - x
+        dy = round(y + SCANNER_DISTANCE * sin_d(edge)) - y
+        step = gcd(dx, dy)
+        k = rand.randrange(1, step + 1)
+        targets = [create_robot((x + k * dx // step, y + k * dy // step))]
+
+        expected = shapely_scan(scanner, [scanner, *targets])
+        assert scan_result(scanner, targets) == expected
+
+
+def test_scanner_does_not_find_itself():
+    scanner = create_robot((500, 500), 0, 10)
+
+    assert scan_result(scanner, []) == -1
+
+
+def test_zero_resolution():
+    scanner = create_robot((500, 500), 0, 0)
+    target = create_robot((600, 500))
+
+    assert scan_result(scanner, [target]) == -1
+
+
+def test_closest_target():
+    scanner = create_robot((100, 100), 0, 10)
+    targets = [create_robot((400, 110)), create_robot((200, 95))]
+
+    assert scan_result(scanner, targets) == 100
@@ -0,0 +1,71 @@
+# global imports
+import pytest
+
+# local imports
+from constants import *
+from game import Game
+from models import RobotToUserModel
+from utils import *
+
+STILL_ROBOT = ('from robot import Robot\n'
+               '\n\n'
+               'class StillRobot(Robot):\n'
+               '    def respond(self):\n'
+               '        pass\n')
+
+
+@pytest.fixture(scope='module')
+def setup():
+    username = 'GameStalemateName'
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    save_robot(robots_dir, 'still_robot.py', STILL_ROBOT)
+    yield username
+    remove_dir(robots_dir)
+
+
+def create_game(setup, stalemate):
+    robots = [RobotToUserModel(name='StillRobot', owner_name=setup)] * 3
+    return Game(STALEMATE_ROUNDS * 5, 1, robots, True,
+                stalemate=stalemate)
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        Game(GAME_ROUNDS, 1, [], False, stalemate='invalid')
+
+
+def test_off_plays_every_round(setup):
+    game = create_game(setup, STALEMATE_OFF)
+    game_log, winner = game.play_single()
+
+    assert len(game_log) == STALEMATE_ROUNDS * 5
+    assert not game.is_stalemate
+    assert winner is None
+
+
+def test_draw_ends_early(setup):
+    game = create_game(setup, STALEMATE_DRAW)
+    game_log, winner = game.play_single()
+
+    assert len(game_log) == STALEMATE_ROUNDS + 1
+    assert game.is_stalemate
+    assert winner is None
+
+
+def test_damage_picks_least_damaged(setup):
+    game = create_game(setup, STALEMATE_DAMAGE)
+    game.damage_at_start = [10, 0, 20]
+    _, winner = game.play_single()
+
+    assert game.is_stalemate
+    assert winner == {'name': 'StillRobot', 'owner': setup}
+    assert game.states[1].damage == 0
+
+
+def test_damage_tie_has_no_winner(setup):
+    game = create_game(setup, STALEMATE_DAMAGE)
+    game.damage_at_start = [10, 0, 0]
+    _, winner = game.play_single()
+
+    assert game.is_stalemate
+    assert winner is None
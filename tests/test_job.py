@@ -0,0 +1,136 @@
+# global imports
+from fastapi import status
+from fastapi.testclient import TestClient
+import pytest
+
+# local imports
+from authentication import create_access_token, get_password_hash
+from constants import *
+from database import setup_db, get_db
+from database_utils import *
+from jobs import all_jobs, job_scheduler
+from utils import *
+from main import app
+
+client = TestClient(app)
+
+SIMULATION = {'rounds': GAME_ROUNDS,
+              'robots_names': ['Default1', 'Default2'],
+              'seed': 3}
+# seeded simulations can be answered from the cache without a job
+UNSEEDED_SIMULATION = {'rounds': GAME_ROUNDS,
+                       'robots_names': ['Default1', 'Default2']}
+
+
+@pytest.fixture(scope='module')
+def setup():
+    setup_db()
+    db = get_db()
+    username = 'JobName'
+    db_create_user(db,
+                   name=username,
+                   password=get_password_hash('Foobar1-'),
+                   email='JobName@hmail.con')
+
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    for robot_name, code in DEFAULT_ROBOTS.items():
+        save_robot(robots_dir, f'{camel_to_snake(robot_name)}.py', code)
+        db_create_robot(db,
+                        owner_name=username,
+                        robot_name=robot_name)
+    yield username
+    remove_dir(robots_dir)
+    db_delete_user(db, username)
+
+
+@pytest.fixture(scope='module')
+def get_header(setup):
+    token = create_access_token(setup)
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture(scope='module')
+def finished_job(get_header):
+    response = client.post('/simulation/create?background=true',
+                           headers=get_header,
+                           json=SIMULATION)
+    job_id = response.json()['job_id']
+    assert all_jobs[job_id].done_event.wait(10)
+    return response, job_id
+
+
+def test_background_simulation(setup, get_header, finished_job):
+    response, job_id = finished_job
+    status_response = client.get(f'/job/status/{job_id}',
+                                 headers=get_header)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert status_response.status_code == status.HTTP_200_OK
+    assert status_response.json() == {'id': job_id,
+                                      'kind': JOB_SIMULATION,
+                                      'owner': setup,
+                                      'status': 'finished'}
+
+
+def test_background_result(get_header, finished_job):
+    _, job_id = finished_job
+    result = client.get(f'/job/result/{job_id}', headers=get_header)
+
+    assert result.status_code == status.HTTP_200_OK
+    assert len(result.json()) == 2
+    assert result.json()[1]['seed'] == 3
+
+
+def test_cancel_finished(get_header, finished_job):
+    _, job_id = finished_job
+    response = client.post(f'/job/cancel/{job_id}', headers=get_header)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['detail'] == 'Job is already done'
+
+
+def test_not_exists(get_header):
+    response = client.get('/job/status/nojob', headers=get_header)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['detail'] == 'Job does not exists'
+
+
+def test_not_owner(finished_job):
+    _, job_id = finished_job
+    token = create_access_token('OtherJobName')
+    header = {'Authorization': f'Bearer {token}'}
+    response = client.get(f'/job/result/{job_id}', headers=header)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['detail'] == 'User is not the owner'
+
+
+def test_queue_full(get_header, monkeypatch):
+    monkeypatch.setattr(job_scheduler, 'queue_size', 0)
+    response = client.post('/simulation/create',
+                           headers=get_header,
+                           json=UNSEEDED_SIMULATION)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()['detail'] == 'Job queue is full'
+
+
+def test_user_limit(get_header, monkeypatch):
+    monkeypatch.setattr(job_scheduler, 'user_limit', 0)
+    response = client.post('/simulation/create',
+                           headers=get_header,
+                           json=UNSEEDED_SIMULATION)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json()['detail'] == 'Too many jobs'
+
+
+def test_simulation_not_kept(get_header):
+    jobs = set(all_jobs)
+    response = client.post('/simulation/create',
+                           headers=get_header,
+                           json=UNSEEDED_SIMULATION)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert set(all_jobs) <= jobs
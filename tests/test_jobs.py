@@ -0,0 +1,159 @@
+# global imports
+from threading import Event
+import pytest
+
+# local imports
+from jobs import *
+
+
+def wait_done(*jobs):
+    for job in jobs:
+        assert job.done_event.wait(5)
+
+
+@pytest.fixture
+def blocked():
+    # one worker, held by a job until the event is set
+    scheduler = JobScheduler(1, 3, 3)
+    started = Event()
+    release = Event()
+
+    def target(_):
+        started.set()
+        release.wait(5)
+
+    job = SimulationJob('JobsName', 'application/json')
+    scheduler.submit(job, target)
+    started.wait(5)
+    yield scheduler, release
+    release.set()
+    wait_done(job)
+
+
+def test_finished_and_failed():
+    scheduler = JobScheduler(1, 2, 2)
+    finished = SimulationJob('JobsName', 'application/json')
+    failed = SimulationJob('JobsName', 'application/json')
+    scheduler.submit(finished, lambda _: b'[]')
+    scheduler.submit(failed, lambda _: 1 / 0)
+    wait_done(finished, failed)
+
+    assert finished.status == JOB_FINISHED
+    assert finished.content == b'[]'
+    assert failed.status == JOB_FAILED
+    assert scheduler.active['JobsName'] == 0
+    assert scheduler.get_job(finished.id) is finished
+
+
+def test_evict_oldest():
+    scheduler = JobScheduler(1, 3, 3, keep_count=2)
+    jobs = [SimulationJob('JobsName', '') for _ in range(3)]
+    for job in jobs:
+        scheduler.submit(job, lambda _: b'[]')
+    wait_done(*jobs)
+
+    assert scheduler.get_job(jobs[0].id) is None
+    assert scheduler.get_job(jobs[1].id) is jobs[1]
+    assert scheduler.get_job(jobs[2].id) is jobs[2]
+
+
+def test_evict_expired():
+    scheduler = JobScheduler(1, 1, 1, keep_seconds=0)
+    job = SimulationJob('JobsName', '')
+    scheduler.submit(job, lambda _: b'[]')
+    wait_done(job)
+
+    assert job.id not in all_jobs
+    assert scheduler.get_job(job.id) is None
+
+
+def test_forget(blocked):
+    scheduler, _ = blocked
+    job = SimulationJob('OtherJobsName', '')
+    scheduler.submit(job, lambda _: None)
+    scheduler.forget(job)
+
+    assert scheduler.get_job(job.id) is None
+
+
+def test_matches_before_simulations(blocked):
+    scheduler, release = blocked
+    order = []
+    simulation = SimulationJob('JobsName', 'application/json')
+    match = MatchJob(1, 1, 0, 'OtherJobsName')
+    scheduler.submit(simulation, lambda _: order.append('simulation'))
+    scheduler.submit(match, lambda _: order.append('match'))
+    release.set()
+    wait_done(simulation, match)
+
+    assert order == ['match', 'simulation']
+
+
+def test_queue_full(blocked):
+    scheduler, _ = blocked
+    for owner in ['A', 'B', 'C']:
+        scheduler.submit(SimulationJob(owner, ''), lambda _: None)
+
+    with pytest.raises(JobQueueFull):
+        scheduler.submit(SimulationJob('D', ''), lambda _: None)
+
+
+def test_user_limit(blocked):
+    scheduler, _ = blocked
+    scheduler.submit(SimulationJob('JobsName', ''), lambda _: None)
+    scheduler.submit(SimulationJob('JobsName', ''), lambda _: None)
+
+    with pytest.raises(JobLimitReached):
+        scheduler.submit(SimulationJob('JobsName', ''), lambda _: None)
+
+
+def test_user_leaves_workers_to_others():
+    scheduler = JobScheduler(JOB_WORKERS, JOB_QUEUE_SIZE, JOB_USER_LIMIT)
+    release = Event()
+    blocked = [SimulationJob('JobsName', '') for _ in range(JOB_USER_LIMIT)]
+    for job in blocked:
+        scheduler.submit(job, lambda _: release.wait(5))
+    with pytest.raises(JobLimitReached):
+        scheduler.submit(SimulationJob('JobsName', ''), lambda _: None)
+
+    other = MatchJob(1, 1, 0, 'OtherJobsName')
+    scheduler.submit(other, lambda _: None)
+    wait_done(other)
+    release.set()
+    wait_done(*blocked)
+
+    assert other.status == JOB_FINISHED
+
+
+def test_cancel_queued(blocked):
+    scheduler, _ = blocked
+    ran = []
+    job = SimulationJob('OtherJobsName', '')
+    scheduler.submit(job, lambda _: ran.append(True))
+
+    assert scheduler.cancel(job)
+    assert job.status == JOB_CANCELLED
+    assert job.is_done
+    assert scheduler.queued == 0
+    assert scheduler.active['OtherJobsName'] == 0
+    assert not scheduler.cancel(job)
+    assert not ran
+
+
+def test_cancel_running():
+    scheduler = JobScheduler(1, 1, 1)
+    started = Event()
+
+    def target(job):
+        started.set()
+        job.cancel_event.wait(5)
+        raise RuntimeError()
+
+    job = SimulationJob('JobsName', '')
+    scheduler.submit(job, target)
+    started.wait(5)
+
+    assert job.status == JOB_RUNNING
+    assert scheduler.cancel(job)
+    wait_done(job)
+    assert job.status == JOB_CANCELLED
@@ -152,6 +152,32 @@ def setup_match(db, setup_user, setup_robot):
     db_delete_match(db, match_id=match_id)
 
 
+@pytest.fixture(scope='module')
+def setup_match_status(db, setup_user, setup_robot):
+    match_data = {'name': 'Match5',
+                  'games': 3,
+                  'rounds': 100,
+                  'num_players_min': 1,
+                  'num_players_max': 4}
+    match_id = db_create_match(db,
+                               **match_data,
+                               owner_name=setup_user,
+                               owner_robot=setup_robot)
+
+    match_data.update({'num_players_min': 2})
+    new_match_state = MatchToUserModel(**match_data,
+                                       id=match_id,
+                                       owner=setup_user,
+                                       robots=[],
+                                       player_count=0)
+    new_room = Room(new_match_state)
+    all_rooms.append(new_room)
+    room_id = len(all_rooms) - 1
+    match_room.update({match_id: room_id})
+    yield match_id
+    db_delete_match(db, match_id=match_id)
+
+
 def test_match_does_not_exist(get_header):
     response = client.post("/match/start",
                            headers=get_header,
@@ -197,5 +223,34 @@ def test_successful(get_header, setup_match):
                            headers=get_header,
                            json={'id': match_id})
 
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert 'job_id' in response.json()
+
+
+def test_status_does_not_exist(get_header):
+    response = client.get("/match/status/nojob", headers=get_header)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['detail'] == 'Job does not exists'
+
+
+def test_status_finished(get_header, setup_user, setup_robot,
+                         setup_match_status):
+    match_id = setup_match_status
+    response = client.post("/match/start",
+                           headers=get_header,
+                           json={'id': match_id, 'seed': 42})
+    job_id = response.json()['job_id']
+
+    response = client.get(f"/match/status/{job_id}", headers=get_header)
+
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == {}
+    assert response.json() == {'id': job_id,
+                               'match_id': match_id,
+                               'games': 3,
+                               'games_played': 3,
+                               'status': 'finished',
+                               'winner': {'name': setup_robot,
+                                          'owner': setup_user},
+                               'seed': 42,
+                               'profiles': None}
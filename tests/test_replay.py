@@ -0,0 +1,89 @@
+# global imports
+import json
+import random
+import pytest
+
+# local imports
+from constants import *
+from game import Game
+from models import RobotToUserModel
+from replay import ReplayEncodeError, decode_replay, encode_replay
+from utils import *
+
+WILD_ROBOT = ('from robot import Robot\n'
+              '\n\n'
+              'class WildRobot(Robot):\n'
+              '    def respond(self):\n'
+              '        self.direction = -90\n'
+              '        self.velocity = 12.7\n'
+              '        self.scanner_direction = 1000\n'
+              '        self.scanner_resolution = -3\n'
+              '        self.cannon(-45.5, 300)\n')
+
+
+@pytest.fixture(scope='module')
+def setup():
+    username = 'ReplayName'
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    for robot_name, code in DEFAULT_ROBOTS.items():
+        file_name = f'{camel_to_snake(robot_name)}.py'
+        save_robot(robots_dir, file_name, code)
+    save_robot(robots_dir, 'wild_robot.py', WILD_ROBOT)
+    yield username
+    remove_dir(robots_dir)
+
+
+@pytest.fixture(scope='module')
+def results(setup):
+    random.seed(0)
+    names = ['Default1', 'Default2', 'Default1', 'Default2']
+    robots = [RobotToUserModel(name=n, owner_name=setup) for n in names]
+    game = Game(1000, 2, robots, True)
+    yield game.play()
+
+
+def test_roundtrip(results):
+    assert decode_replay(encode_replay(results)) == results
+
+
+def test_smaller_than_json(results):
+    replay_size = len(encode_replay(results))
+    json_size = len(json.dumps(results).encode())
+
+    assert replay_size * 5 < json_size
+
+
+def test_empty_game():
+    results = [[], {'winner': None, 'seed': 0}]
+
+    assert decode_replay(encode_replay(results)) == results
+
+
+def test_invalid_replay():
+    with pytest.raises(ValueError):
+        decode_replay(b'JSON\x00\x00\x00\x00')
+
+
+def test_robot_written_values_roundtrip(setup):
+    names = ['WildRobot', 'Default1']
+    robots = [RobotToUserModel(name=n, owner_name=setup) for n in names]
+    results = Game(100, 1, robots, True, seed=2).play()
+    wild = results[0][0]['robots'][0]
+
+    assert wild['direction'] == 270
+    assert wild['velocity'] == 12
+    assert wild['scanner_direction'] == 280
+    assert wild['scanner_resolution'] == 0
+    assert decode_replay(encode_replay(results)) == results
+
+
+@pytest.mark.parametrize('value', [-1, 1.5])
+def test_values_that_do_not_fit(value):
+    robot = {'damage': 0, 'direction': value, 'velocity': 0,
+             'position': (0, 0), 'scanner_direction': 0,
+             'scanner_resolution': 0}
+    results = [[{'robots': [robot], 'missiles': []}],
+               {'winner': None, 'seed': 0}]
+
+    with pytest.raises(ReplayEncodeError):
+        encode_replay(results)
@@ -0,0 +1,41 @@
+# local imports
+from result_cache import ResultCache
+
+
+def test_get_missing():
+    cache = ResultCache(100)
+
+    assert cache.get('missing') is None
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(30)
+    cache.put('a', b'a' * 10)
+    cache.put('b', b'b' * 10)
+    cache.put('c', b'c' * 10)
+    cache.get('a')
+    cache.put('d', b'd' * 10)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'a' * 10
+    assert cache.get('c') == b'c' * 10
+    assert cache.get('d') == b'd' * 10
+    assert cache.size == 30
+
+
+def test_replace_keeps_size():
+    cache = ResultCache(30)
+    cache.put('a', b'a' * 10)
+    cache.put('a', b'a' * 20)
+
+    assert cache.size == 20
+    assert cache.get('a') == b'a' * 20
+
+
+def test_too_big_is_not_cached():
+    cache = ResultCache(10)
+    cache.put('a', b'a' * 5)
+    cache.put('b', b'b' * 11)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'a' * 5
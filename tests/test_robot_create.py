@@ -69,6 +69,17 @@ def test_with_invalid_avatar(get_header, setup_robot):
     assert response.json()["detail"] == "Invalid avatar content"
 
 
+def test_invalid_code(get_header, setup_robot):
+    name, _, _ = setup_robot
+    response = client.post('/robot/create',
+                           headers=get_header,
+                           json={'name': name,
+                                 'code': 'class Robot1(:\n'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Invalid robot code"
+
+
 def test_successful_without_avatar(get_header, setup_robot):
     name, code, _ = setup_robot
     response = client.post('/robot/create',
@@ -0,0 +1,91 @@
+# global imports
+import pytest
+
+# local imports
+from constants import *
+from robot_loader import *
+from utils import *
+
+ROBOT_CODE = ('from robot import Robot\n'
+              '\n\n'
+              'class LoaderRobot(Robot):\n'
+              '    VERSION = {}\n')
+
+
+@pytest.fixture
+def setup():
+    username = 'RobotLoaderName'
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    save_robot(robots_dir, 'loader_robot.py', ROBOT_CODE.format(1))
+    yield username, robots_dir
+    invalidate_robot_class(username, 'LoaderRobot')
+    remove_dir(robots_dir)
+
+
+def test_cached_class(setup):
+    username, _ = setup
+    first = load_robot_class(username, 'LoaderRobot')
+    second = load_robot_class(username, 'LoaderRobot')
+
+    assert first is second
+    assert first.VERSION == 1
+
+
+def test_edit_is_loaded(setup):
+    username, robots_dir = setup
+    first = load_robot_class(username, 'LoaderRobot')
+    save_robot(robots_dir, 'loader_robot.py',
+               ROBOT_CODE.format(1234), overwrite=True)
+    second = load_robot_class(username, 'LoaderRobot')
+
+    assert first is not second
+    assert second.VERSION == 1234
+
+
+def test_invalidate(setup):
+    username, _ = setup
+    first = load_robot_class(username, 'LoaderRobot')
+    invalidate_robot_class(username, 'LoaderRobot')
+    second = load_robot_class(username, 'LoaderRobot')
+
+    assert first is not second
+
+
+def test_missing_robot(setup):
+    username, _ = setup
+    with pytest.raises(FileNotFoundError):
+        load_robot_class(username, 'MissingRobot')
+
+
+def test_wrong_class_name(setup):
+    username, robots_dir = setup
+    save_robot(robots_dir, 'other_name.py', ROBOT_CODE.format(1))
+    with pytest.raises(AttributeError):
+        load_robot_class(username, 'OtherName')
+
+
+def test_code_store_is_used(setup, monkeypatch):
+    username, _ = setup
+    save_robot_code(username, 'LoaderRobot', ROBOT_CODE.format(1))
+
+    def fail_compile(*args):
+        raise AssertionError('robot code compiled again')
+    monkeypatch.setattr('robot_loader.compile_robot', fail_compile)
+
+    assert load_robot_class(username, 'LoaderRobot').VERSION == 1
+
+
+def test_outdated_code_store(setup):
+    username, robots_dir = setup
+    save_robot_code(username, 'LoaderRobot', ROBOT_CODE.format(1))
+    save_robot(robots_dir, 'loader_robot.py',
+               ROBOT_CODE.format(2), overwrite=True)
+
+    assert load_robot_class(username, 'LoaderRobot').VERSION == 2
+    assert path_exists(get_robot_code_path(username, 'LoaderRobot'))
+
+
+def test_invalid_code(setup):
+    username, _ = setup
+    with pytest.raises(SyntaxError):
+        save_robot_code(username, 'LoaderRobot', 'class LoaderRobot(:\n')
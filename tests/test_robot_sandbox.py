@@ -0,0 +1,232 @@
+# global imports
+import time
+import pytest
+
+# local imports
+from constants import *
+from game import Game
+from models import RobotToUserModel
+from robot import RobotState
+from robot_protocol import *
+import robot_sandbox
+import robot_worker
+from utils import *
+
+MEMORY_ROBOT = ('from robot import Robot\n'
+                '\n\n'
+                'class MemoryRobot(Robot):\n'
+                '    def respond(self):\n'
+                '        self.memory = bytearray(2 * 1024 * 1024 * 1024)\n')
+
+SPIN_ROBOT = ('from robot import Robot\n'
+              '\n\n'
+              'class SpinRobot(Robot):\n'
+              '    def respond(self):\n'
+              '        sum(range(10 ** 12))\n')
+
+CHEAT_ROBOT = ('from robot import Robot\n'
+               '\n\n'
+               'class CheatRobot(Robot):\n'
+               '    def respond(self):\n'
+               '        self.damage = 0\n'
+               '        self.position = (0, 0)\n'
+               '        self.velocity = 1000\n'
+               '        self.scanner_resolution = 50\n')
+
+SLEEP_ROBOT = ('import time\n'
+               'from robot import Robot\n'
+               '\n\n'
+               'class SleepRobot(Robot):\n'
+               '    def respond(self):\n'
+               '        time.sleep(0.2)\n')
+
+BROKEN_ROBOT = ('from robot import Robot\n'
+                '\n\n'
+                'class BrokenRobot(Robot)\n')
+
+
+@pytest.fixture(scope='module')
+def setup():
+    username = 'RobotSandboxName'
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    for robot_name, code in DEFAULT_ROBOTS.items():
+        save_robot(robots_dir, f'{camel_to_snake(robot_name)}.py', code)
+    save_robot(robots_dir, 'memory_robot.py', MEMORY_ROBOT)
+    save_robot(robots_dir, 'spin_robot.py', SPIN_ROBOT)
+    save_robot(robots_dir, 'cheat_robot.py', CHEAT_ROBOT)
+    save_robot(robots_dir, 'broken_robot.py', BROKEN_ROBOT)
+    save_robot(robots_dir, 'sleep_robot.py', SLEEP_ROBOT)
+    yield username
+    remove_dir(robots_dir)
+
+
+def create_game(setup, names, sandbox=True, rounds=GAME_ROUNDS):
+    robots = [RobotToUserModel(name=n, owner_name=setup) for n in names]
+    return Game(rounds, 1, robots, True, seed=11, sandbox=sandbox)
+
+
+def test_same_results_as_threads(setup):
+    names = ['Default1', 'Default2', 'Default1', 'Default2']
+    sandboxed = create_game(setup, names).play()
+    threaded = create_game(setup, names, sandbox=False).play()
+
+    assert sandboxed == threaded
+
+
+def test_shared_memory_transport(setup, monkeypatch):
+    names = ['Default1', 'Default2', 'Default1', 'Default2']
+    threaded = create_game(setup, names, sandbox=False).play()
+    monkeypatch.setattr(robot_sandbox, 'ROBOT_SANDBOX_TRANSPORT',
+                        TRANSPORT_SHM)
+    game = create_game(setup, names)
+    sandboxed = game.play()
+
+    assert sandboxed == threaded
+    assert all(w.rings is not None for w in game.workers)
+    assert all(not w.process.is_alive() for w in game.workers)
+
+
+def test_shared_memory_spin_is_killed(setup, monkeypatch):
+    monkeypatch.setattr(robot_sandbox, 'ROBOT_SANDBOX_TRANSPORT',
+                        TRANSPORT_SHM)
+    game = create_game(setup, ['Default1', 'SpinRobot'])
+    log = game.play()
+
+    assert log[1]['winner'] == {'name': 'Default1', 'owner': setup}
+    assert not game.workers[1].process.is_alive()
+
+
+def test_invalid_transport():
+    with pytest.raises(ValueError):
+        robot_sandbox.SandboxWorker('owner', 'name', RobotState(),
+                                    transport='carrier pigeon')
+
+
+def test_memory_limit(setup):
+    game = create_game(setup, ['Default1', 'MemoryRobot'])
+    log = game.play()
+
+    assert len(log[0]) == 1
+    assert log[1]['winner'] == {'name': 'Default1', 'owner': setup}
+
+
+def test_c_level_spin_is_killed(setup):
+    game = create_game(setup, ['Default1', 'SpinRobot'])
+    start = time.monotonic()
+    log = game.play()
+
+    assert time.monotonic() - start < 5
+    assert log[1]['winner'] == {'name': 'Default1', 'owner': setup}
+    assert log[1]['timeouts'][0]['reason'] == TIMEOUT_CALL
+    assert not game.workers[1].process.is_alive()
+
+
+@pytest.mark.parametrize('sandbox', [True, False])
+def test_sleeping_robot_is_stopped(setup, sandbox, monkeypatch):
+    monkeypatch.setattr(robot_worker, 'ROBOT_WALL_BUDGET', 0.5)
+    game = create_game(setup, ['Default1', 'SleepRobot'], sandbox=sandbox,
+                       rounds=20)
+    start = time.monotonic()
+    log = game.play()
+
+    assert time.monotonic() - start < 2
+    assert log[1]['timeouts'] == [{'name': 'SleepRobot',
+                                   'owner': setup,
+                                   'reason': TIMEOUT_WALL}]
+
+
+def test_engine_fields_are_ignored(setup):
+    game = create_game(setup, ['CheatRobot', 'CheatRobot'], rounds=1)
+    game.damage_at_start = [40, 40]
+    log = game.play()
+
+    for r in log[0][0]['robots']:
+        assert r['damage'] == 40
+        assert r['velocity'] == 100
+        assert r['scanner_resolution'] == 10
+
+
+@pytest.mark.parametrize('name', ['BrokenRobot', 'MissingRobot'])
+def test_robot_that_does_not_load(setup, name):
+    game = create_game(setup, ['Default1', name])
+    log = game.play()
+
+    assert len(log[0]) == 1
+    assert log[0][0]['robots'][1]['damage'] == 100
+    assert log[1]['winner'] == {'name': 'Default1', 'owner': setup}
+
+
+def test_children_are_stopped(setup):
+    game = create_game(setup, ['Default1', 'Default2'])
+    game.play()
+
+    assert all(not w.process.is_alive() for w in game.workers)
+
+
+def test_protocol_sensors():
+    state = RobotState()
+    state.position = (999, 3)
+    state.damage = 42
+    state.velocity = 100
+    state.direction = 359
+    state.accel = 60
+    state.scanner_result = 1414
+    state.cannon_ready = True
+    state.cannon_fired = True
+    state.scanner_direction = 90
+
+    data = pack_sensors(METHODS.index('respond'), state)
+    received = RobotState()
+    method = unpack_sensors(data, received)
+
+    assert len(data) == SENSORS_STRUCT.size
+    assert METHODS[method] == 'respond'
+    assert received.position == (999, 3)
+    assert received.damage == 42
+    assert received.velocity == 100
+    assert received.direction == 359
+    assert received.accel == 60
+    assert received.scanner_result == 1414
+    assert received.cannon_ready and received.cannon_fired
+    # commands are not part of the sensors
+    assert received.scanner_direction == 0
+
+
+def test_protocol_commands():
+    state = RobotState()
+    state.direction = -90
+    state.velocity = 1000
+    state.scanner_direction = 720
+    state.scanner_resolution = 50
+    state.cannon_fired = True
+    state.cannon_direction = 45
+    state.cannon_distance = 800
+    state.damage = 0
+
+    data = pack_commands(True, state, 0.5, 1.5)
+    engine = RobotState()
+    engine.damage = 40
+    ok, seconds, cpu = unpack_commands(data, engine)
+
+    assert len(data) == COMMANDS_STRUCT.size
+    assert ok and seconds == 0.5 and cpu == 1.5
+    assert engine.direction == 270
+    assert engine.velocity == 100
+    assert engine.scanner_direction == 0
+    assert engine.scanner_resolution == 10
+    assert engine.cannon_fired
+    assert engine.cannon_direction == 45
+    assert engine.cannon_distance == 700
+    assert engine.damage == 40
+
+
+def test_protocol_invalid_commands():
+    state = RobotState()
+    state.velocity = 'fast'
+    engine = RobotState()
+    engine.velocity = 50
+
+    ok, _, _ = unpack_commands(pack_commands(True, state, 0.0, 0.0), engine)
+
+    assert not ok
+    assert engine.velocity == 50
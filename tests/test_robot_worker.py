@@ -0,0 +1,181 @@
+# global imports
+import gc
+import threading
+import time
+import pytest
+
+# local imports
+from constants import *
+from game import Game
+from models import RobotToUserModel
+from robot import Robot
+import robot_worker
+from robot_worker import RobotWorker
+from utils import *
+
+LOOP_ROBOT = ('from robot import Robot\n'
+              '\n\n'
+              'class LoopRobot(Robot):\n'
+              '    def respond(self):\n'
+              '        while True:\n'
+              '            pass\n')
+
+
+class CountRobot(Robot):
+    def initialize(self):
+        self.threads = set()
+
+    def respond(self):
+        self.threads.add(threading.get_ident())
+
+
+class SlowRobot(Robot):
+    def respond(self):
+        while True:
+            time.sleep(0.001)
+
+
+class BlockedRobot(Robot):
+    def respond(self):
+        time.sleep(ROBOT_TIMEOUT * 2)
+
+
+class BusyRobot(Robot):
+    def respond(self):
+        start = time.thread_time()
+        while time.thread_time() - start < 0.01:
+            pass
+
+
+class CollectRobot(Robot):
+    def respond(self):
+        gc.collect()
+
+
+class FailRobot(Robot):
+    def respond(self):
+        raise ValueError()
+
+
+@pytest.fixture(scope='module')
+def setup():
+    username = 'RobotWorkerName'
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    save_robot(robots_dir, 'default1.py', DEFAULT_ROBOTS['Default1'])
+    save_robot(robots_dir, 'loop_robot.py', LOOP_ROBOT)
+    yield username
+    remove_dir(robots_dir)
+
+
+def test_same_thread_for_every_call():
+    robot = CountRobot()
+    worker = RobotWorker(robot)
+    assert worker.call('initialize')
+    for _ in range(100):
+        assert worker.call('respond')
+    worker.stop()
+
+    assert robot.threads == {worker.thread.ident}
+
+
+def test_timeout():
+    worker = RobotWorker(SlowRobot())
+    start = time.monotonic()
+
+    assert not worker.call('respond')
+    assert time.monotonic() - start < 0.5
+    assert worker.cpu.exceeded == TIMEOUT_WALL
+    worker.thread.join(1)
+    assert not worker.thread.is_alive()
+    assert not worker.call('respond')
+
+
+def test_blocked_call_is_not_charged():
+    worker = RobotWorker(BlockedRobot())
+
+    assert worker.call('respond')
+    assert worker.cpu.seconds < ROBOT_TIMEOUT
+    assert worker.cpu.exceeded is None
+    worker.stop()
+
+
+def test_wall_budget(monkeypatch):
+    monkeypatch.setattr(robot_worker, 'ROBOT_WALL_BUDGET',
+                        ROBOT_TIMEOUT * 3)
+    worker = RobotWorker(BlockedRobot())
+
+    assert worker.call('respond')
+    assert not worker.call('respond')
+    assert worker.cpu.exceeded == TIMEOUT_WALL
+    assert worker.cpu.wall_seconds >= ROBOT_TIMEOUT * 3
+    assert worker.is_stopped
+
+
+def test_cpu_budget(monkeypatch):
+    monkeypatch.setattr(robot_worker, 'ROBOT_CPU_BUDGET', 0.035)
+    worker = RobotWorker(BusyRobot())
+
+    assert worker.call('respond')
+    assert worker.call('respond')
+    assert worker.call('respond')
+    assert not worker.call('respond')
+    assert worker.cpu.exceeded == TIMEOUT_BUDGET
+    assert worker.cpu.calls == 4
+    assert worker.cpu.max_call >= 0.01
+    assert worker.is_stopped
+
+
+def test_gc_pause_is_not_charged():
+    def slow_gc(phase, _):
+        if phase == 'start':
+            time.sleep(ROBOT_TIMEOUT * 2)
+
+    worker = RobotWorker(CollectRobot())
+    gc.callbacks.append(slow_gc)
+    try:
+        assert worker.call('respond')
+    finally:
+        gc.callbacks.remove(slow_gc)
+        worker.stop()
+
+
+def test_exception():
+    worker = RobotWorker(FailRobot())
+
+    assert not worker.call('respond')
+    assert worker.call('initialize')
+    worker.stop()
+
+
+def test_stop():
+    worker = RobotWorker(Robot())
+    worker.stop()
+    worker.thread.join(1)
+
+    assert not worker.thread.is_alive()
+
+
+def test_game_timeout_kills_robot(setup):
+    robots = [RobotToUserModel(name='Default1', owner_name=setup),
+              RobotToUserModel(name='LoopRobot', owner_name=setup)]
+    game = Game(GAME_ROUNDS, 1, robots, True)
+    log = game.play()
+
+    assert len(log[0]) == 1
+    assert log[0][0]['robots'][1]['damage'] == 100
+    assert log[1]['winner'] == {'name': 'Default1', 'owner': setup}
+    assert log[1]['timeouts'] == [{'name': 'LoopRobot',
+                                   'owner': setup,
+                                   'reason': TIMEOUT_CALL}]
+
+
+def test_cpu_in_profile(setup):
+    robots = [RobotToUserModel(name='Default1', owner_name=setup),
+              RobotToUserModel(name='Default1', owner_name=setup)]
+    game = Game(10, 1, robots, True, seed=1, profile=True)
+    log = game.play()
+
+    assert 'timeouts' not in log[1]
+    for r in log[1]['profile']['robots']:
+        assert r['cpu']['calls'] == 11
+        assert 0 <= r['cpu']['max'] <= r['cpu']['seconds'] < ROBOT_TIMEOUT
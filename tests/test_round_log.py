@@ -0,0 +1,59 @@
+# global imports
+import json
+import random
+import pytest
+
+# local imports
+from constants import *
+from game import Game
+from models import RobotToUserModel
+from round_log import reconstruct_rounds
+from utils import *
+
+
+@pytest.fixture(scope='module')
+def setup():
+    username = 'RoundLogName'
+    robots_dir = f'{ROBOTS_DIR}/{username}'
+    for robot_name, code in DEFAULT_ROBOTS.items():
+        file_name = f'{camel_to_snake(robot_name)}.py'
+        save_robot(robots_dir, file_name, code)
+    yield username
+    remove_dir(robots_dir)
+
+
+def play_with_seed(setup, seed, log_mode):
+    random.seed(seed)
+    names = ['Default1', 'Default2', 'Default1', 'Default2']
+    robots = [RobotToUserModel(name=n, owner_name=setup) for n in names]
+    game = Game(1000, 1, robots, True, log_mode)
+    return game.play()
+
+
+def test_invalid_log_mode():
+    with pytest.raises(ValueError):
+        Game(GAME_ROUNDS, 1, [], True, log_mode='invalid')
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_reconstruct_same_rounds(setup, seed):
+    full_log, full_winner = play_with_seed(setup, seed, LOG_FULL)
+    delta_log, delta_winner = play_with_seed(setup, seed, LOG_DELTA)
+
+    assert reconstruct_rounds(delta_log) == full_log
+    assert delta_winner == full_winner
+
+
+def test_keyframes(setup):
+    delta_log, _ = play_with_seed(setup, 0, LOG_DELTA)
+    keyframes = [i for i, r in enumerate(delta_log) if r['keyframe']]
+
+    assert keyframes == list(range(0, len(delta_log),
+                                   LOG_KEYFRAME_INTERVAL))
+
+
+def test_smaller_than_full(setup):
+    full_log, _ = play_with_seed(setup, 0, LOG_FULL)
+    delta_log, _ = play_with_seed(setup, 0, LOG_DELTA)
+
+    assert len(json.dumps(delta_log)) * 2 < len(json.dumps(full_log))
@@ -0,0 +1,41 @@
+# global imports
+from multiprocessing import Semaphore
+import pytest
+
+# local imports
+from shared_ring import SharedRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRing(4, 2, Semaphore(0))
+    yield ring
+    ring.close()
+
+
+def test_messages_keep_order(ring):
+    for i in range(5):
+        assert ring.put(bytes([i]) * 4)
+        assert ring.get(0) == bytes([i]) * 4
+
+
+def test_full_ring_rejects(ring):
+    assert ring.put(b'aaaa')
+    assert ring.put(b'bbbb')
+    assert not ring.put(b'cccc')
+    assert ring.get(0) == b'aaaa'
+    assert ring.put(b'cccc')
+
+
+def test_empty_ring_times_out(ring):
+    assert ring.get(0.01) is None
+
+
+def test_attached_ring(ring):
+    other = SharedRing(*ring.attach_args())
+    ring.put(b'abcd')
+
+    assert other.get(0) == b'abcd'
+    assert other.put(b'efgh')
+    assert ring.get(0) == b'efgh'
+    other.close()
@@ -1,5 +1,8 @@
 # global imports
+import asyncio
 from fastapi import status
+import json
+import os
 from fastapi.testclient import TestClient
 import pytest
 
@@ -8,11 +11,23 @@ from authentication import create_access_token, get_password_hash
 from constants import *
 from database import setup_db, get_db
 from database_utils import *
+from game import Game
+from jobs import *
+from replay import ReplayEncodeError, decode_replay
+import router_simulation
+from round_log import reconstruct_rounds
+from router_simulation import start_stream
 from utils import *
 from main import app
 
 client = TestClient(app)
 
+IDLE_ROBOT = ('from robot import Robot\n'
+              '\n\n'
+              'class IdleRobot(Robot):\n'
+              '    def respond(self):\n'
+              '        pass\n')
+
 
 @pytest.fixture(scope='module')
 def setup():
@@ -33,6 +48,7 @@ def setup():
         db_create_robot(db,
                         owner_name=username,
                         robot_name=robot_name)
+    save_robot(robots_dir, 'idle_robot.py', IDLE_ROBOT)
     yield username
     remove_dir(robots_dir)
     db_delete_user(db, username)
@@ -118,3 +134,232 @@ def test_successful(get_header):
                                                   "Default2"]})
 
     assert response.status_code == status.HTTP_200_OK
+
+
+def test_same_seed_same_results(get_header):
+    simulation = {"rounds": GAME_ROUNDS,
+                  "robots_names": ["Default1", "Default2"],
+                  "seed": 5}
+    first = client.post("/simulation/create",
+                        headers=get_header,
+                        json=simulation)
+    second = client.post("/simulation/create",
+                         headers=get_header,
+                         json=simulation)
+
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json()[1]['seed'] == 5
+    assert first.json() == second.json()
+
+
+def test_seeded_results_are_cached(get_header, monkeypatch):
+    simulation = {"rounds": GAME_ROUNDS,
+                  "robots_names": ["Default1", "Default2"],
+                  "seed": 6}
+    first = client.post("/simulation/create",
+                        headers=get_header,
+                        json=simulation)
+
+    def fail_play(*_, **__):
+        raise AssertionError('simulation played again')
+
+    monkeypatch.setattr(Game, 'play', fail_play)
+    second = client.post("/simulation/create",
+                         headers=get_header,
+                         json=simulation)
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.content == first.content
+
+
+def test_successful_profile(get_header):
+    response = client.post("/simulation/create?profile=true",
+                           headers=get_header,
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1", "Default2"],
+                                 "seed": 6})
+
+    assert response.status_code == status.HTTP_200_OK
+    profile = response.json()[1]['profile']
+    assert profile['phases']['round']['calls'] == len(response.json()[0])
+    assert len(profile['robots']) == 2
+
+
+def test_invalid_format(get_header):
+    response = client.post("/simulation/create?format=xml",
+                           headers=get_header,
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1",
+                                                  "Default2"]})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()['detail'] == 'Invalid format'
+
+
+def test_successful_replay_query(get_header):
+    response = client.post("/simulation/create?format=replay",
+                           headers=get_header,
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1",
+                                                  "Default2"]})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-type'] == REPLAY_MEDIA_TYPE
+    results = decode_replay(response.content)
+    assert len(results) == 2
+    assert 0 < len(results[0]) <= GAME_ROUNDS
+
+
+def test_successful_replay_accept(get_header):
+    response = client.post("/simulation/create",
+                           headers={**get_header,
+                                    'Accept': REPLAY_MEDIA_TYPE},
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1",
+                                                  "Default2"]})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-type'] == REPLAY_MEDIA_TYPE
+    assert len(decode_replay(response.content)) == 2
+
+
+def test_replay_that_can_not_be_encoded(get_header, monkeypatch):
+    def encode_replay(_):
+        raise ReplayEncodeError('Invalid replay value')
+
+    monkeypatch.setattr(router_simulation, 'encode_replay', encode_replay)
+    response = client.post("/simulation/create?format=replay",
+                           headers=get_header,
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1",
+                                                  "Default2"]})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()['detail'] == ('Simulation can not be saved as '
+                                         'replay')
+
+
+def test_invalid_log_mode(get_header):
+    response = client.post("/simulation/create?log=compressed",
+                           headers=get_header,
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1",
+                                                  "Default2"]})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()['detail'] == 'Invalid log mode'
+
+
+def test_successful_delta_log(get_header):
+    response = client.post("/simulation/create?log=delta",
+                           headers=get_header,
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1",
+                                                  "Default2"]})
+
+    assert response.status_code == status.HTTP_200_OK
+    game_log = response.json()[0]
+    assert game_log[0]['keyframe']
+    rounds = reconstruct_rounds(game_log)
+    assert all(len(r['robots']) == 2 for r in rounds)
+
+
+def test_stream_too_many_robots(get_header):
+    response = client.post("/simulation/stream",
+                           headers=get_header,
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1"] * 5})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()['detail'] == 'Too many robots'
+
+
+def test_successful_stream(get_header):
+    response = client.post("/simulation/stream",
+                           headers=get_header,
+                           json={"rounds": GAME_ROUNDS,
+                                 "robots_names": ["Default1",
+                                                  "Default2",
+                                                  "Default1"]})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-type'] == SIMULATION_STREAM_MEDIA_TYPE
+    lines = [json.loads(line) for line in response.iter_lines()]
+    assert 0 < len(lines) - 1 <= GAME_ROUNDS
+    assert all(len(r['robots']) == 3 for r in lines[:-1])
+    assert 'winner' in lines[-1]
+    assert 'seed' in lines[-1]
+
+
+def new_stream(owner: str, rounds: int, names=('Default1', 'Default2')):
+    robots = [RobotToUserModel(name=r, owner_name=owner) for r in names]
+    job = SimulationJob(owner, SIMULATION_STREAM_MEDIA_TYPE)
+    game = Game(rounds, 1, robots, True, cancel=job.cancel_event)
+    return job, start_stream(job, game)
+
+
+@pytest.mark.asyncio
+async def test_stream_closed_early(setup):
+    job, stream = new_stream(setup, 10000)
+    for _ in range(3):
+        assert 'robots' in json.loads(await stream.__anext__())
+
+    # closing waits for the game to stop
+    await asyncio.wait_for(stream.aclose(), timeout=5)
+    assert job.is_done
+    assert job.id not in all_jobs
+
+
+@pytest.mark.asyncio
+async def test_more_streams_than_threads(setup, monkeypatch):
+    # more streams than default executor threads, all of them are read
+    # together and each one fills its buffer
+    count = min(32, (os.cpu_count() or 1) + 4) + 1
+    monkeypatch.setattr(stream_scheduler, 'user_limit', count)
+    rounds = SIMULATION_STREAM_BUFFER * 2
+
+    async def read(stream):
+        return [json.loads(line) async for line in stream]
+
+    streams = [new_stream(setup, rounds)[1] for _ in range(count)]
+    results = await asyncio.wait_for(
+        asyncio.gather(*[read(stream) for stream in streams]), timeout=60)
+
+    for lines in results:
+        assert 'winner' in lines[-1]
+        assert all('robots' in r for r in lines[:-1])
+
+
+@pytest.mark.asyncio
+async def test_slow_streams_do_not_block_matches(setup, monkeypatch):
+    # one stream per job worker, none of them is read after its first line
+    monkeypatch.setattr(stream_scheduler, 'user_limit', JOB_WORKERS)
+    streams = [new_stream(setup, 10000)[1] for _ in range(JOB_WORKERS)]
+    try:
+        for stream in streams:
+            await stream.__anext__()
+
+        match = MatchJob(1, 1, 0, setup)
+        job_scheduler.submit(match, lambda _: None)
+        await asyncio.wait_for(wait_job(match), timeout=5)
+        assert match.status == JOB_FINISHED
+    finally:
+        for stream in streams:
+            await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_deadline(setup, monkeypatch):
+    # reading keeps going but the whole stream has one deadline
+    monkeypatch.setattr(router_simulation, 'SIMULATION_STREAM_TIMEOUT', 0.5)
+    job, stream = new_stream(setup, 10000, ('IdleRobot', 'IdleRobot'))
+    start = asyncio.get_running_loop().time()
+    lines = []
+    async for line in stream:
+        lines.append(json.loads(line))
+        await asyncio.sleep(0.005)
+
+    assert asyncio.get_running_loop().time() - start < 5
+    assert job.is_done
+    assert 'winner' not in lines[-1]
+    assert SIMULATION_STREAM_BUFFER < len(lines) < 10000
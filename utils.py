@@ -10,6 +10,17 @@ from typing import Tuple
 # local imports
 from constants import *
 
+# engine directions are in [0, 360), scanner borders can go
+# TRIG_TABLE_OFFSET degrees out of that range
+TRIG_TABLE_OFFSET = 10
+TRIG_TABLE_DEGREES = range(-TRIG_TABLE_OFFSET, 360 + TRIG_TABLE_OFFSET)
+COS_TABLE = {d: cos(radians(d)) for d in TRIG_TABLE_DEGREES}
+SIN_TABLE = {d: sin(radians(d)) for d in TRIG_TABLE_DEGREES}
+
+# round(distance) <= radius is the same as distance^2 < (radius + 0.5)^2
+MISSILE_SQUARED_AREAS = [((radius + 0.5)**2, damage)
+                         for radius, damage in MISSILE_DAMAGE_AREAS]
+
 
 def ensure_directory(directory: str):
     Path(directory).mkdir(parents=True, exist_ok=True)
@@ -58,11 +69,17 @@ def clamp(min_value: int, value: int, max_value: int):
 
 
 def cos_d(degrees: int):
-    return cos(radians(degrees))
+    value = COS_TABLE.get(degrees)
+    if value is None:
+        value = cos(radians(degrees))
+    return value
 
 
 def sin_d(degrees: int):
-    return sin(radians(degrees))
+    value = SIN_TABLE.get(degrees)
+    if value is None:
+        value = sin(radians(degrees))
+    return value
 
 
 def get_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]):
@@ -72,6 +89,32 @@ def get_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]):
     return distance
 
 
+def get_squared_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]):
+    x1, y1 = pos1
+    x2, y2 = pos2
+    return (x1 - x2)**2 + (y1 - y2)**2
+
+
+def get_missile_damage(squared_distance: int):
+    for squared_radius, damage in MISSILE_SQUARED_AREAS:
+        if squared_distance < squared_radius:
+            return damage
+    return 0
+
+
+def triangle_contains(triangle: Tuple[Tuple[int, int], ...],
+                      point: Tuple[int, int]) -> bool:
+    # same as shapely Polygon.contains, points on the border are outside
+    (ax, ay), (bx, by), (cx, cy) = triangle
+    px, py = point
+    d1 = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+    d2 = (cx - bx) * (py - by) - (cy - by) * (px - bx)
+    d3 = (ax - cx) * (py - cy) - (ay - cy) * (px - cx)
+    positive = d1 > 0 and d2 > 0 and d3 > 0
+    negative = d1 < 0 and d2 < 0 and d3 < 0
+    return positive or negative
+
+
 def validate_email(email: str) -> bool:
     res = True
 